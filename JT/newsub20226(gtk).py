@@ -1,11 +1,14 @@
 import sys
 import threading
+import collections
 import time
 import gi
 import subprocess
 import re
 import os
 import traceback 
+import shutil
+import json
 
 gi.require_version('Gtk', '4.0')
 from gi.repository import Gtk, Gdk, GLib, Gio 
@@ -15,17 +18,1181 @@ class ListItemRow(Gtk.ListBoxRow):
     def __init__(self, display_text, data=None):
         super().__init__()
         self.data = data # Store the full connection/device data here
-        label = Gtk.Label(label=display_text, xalign=0)
-        label.set_margin_start(5)
-        self.set_child(label)
+        self.label = Gtk.Label(label=display_text, xalign=0)
+        self.label.set_margin_start(5)
+        self.set_child(self.label)
+
+
+class TaskPool:
+    """A fixed set of worker threads shared by every panel.
+
+    Each panel has its own FIFO queue and idle workers take from the panels
+    in turn. Long tasks (a speedtest, waiting for a connection, a Bluetooth
+    scan) must not starve short ones, so no panel runs more than max_per_panel
+    tasks at once (half the workers by default) and the last idle worker only
+    takes a task from a panel with nothing running. A panel that is idle, such
+    as audio while the Wi-Fi panel runs a speedtest, always finds a worker.
+    cancel(panel) drops that panel's queued cancellable tasks; tasks already
+    running are left to finish. Queue wait and run time are kept per panel.
+    """
+
+    def __init__(self, workers=4, max_per_panel=None):
+        self._cond = threading.Condition()
+        self._queues = {}   # panel -> deque of (task, cancellable, queued_at)
+        self._panels = []   # round-robin order of self._queues
+        self._running = collections.Counter()  # panel -> tasks currently on a worker
+        self._workers = workers
+        self.max_per_panel = max_per_panel or max(1, workers // 2)
+        self._turn = 0
+        self._closed = False
+        self._stats = collections.defaultdict(lambda: {
+            "done": 0, "cancelled": 0, "wait": 0.0, "max_wait": 0.0, "run": 0.0, "max_run": 0.0})
+        for _ in range(workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, panel, task, cancellable=False):
+        with self._cond:
+            if self._closed:
+                return
+            if panel not in self._queues:
+                self._queues[panel] = collections.deque()
+                self._panels.append(panel)
+            self._queues[panel].append((task, cancellable, time.monotonic()))
+            self._cond.notify()
+
+    def cancel(self, panel):
+        """Drops the queued cancellable tasks of one panel."""
+        with self._cond:
+            queue = self._queues.get(panel)
+            if not queue:
+                return
+            kept = collections.deque(item for item in queue if not item[1])
+            self._stats[panel]["cancelled"] += len(queue) - len(kept)
+            self._queues[panel] = kept
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            self._queues.clear()
+            self._cond.notify_all()
+
+    def describe(self):
+        """One line per panel: queue depth, completed/cancelled counts, latencies."""
+        with self._cond:
+            lines = []
+            for panel in self._panels:
+                stats = self._stats[panel]
+                done = stats["done"] or 1
+                lines.append(
+                    f"{panel}: queued={len(self._queues.get(panel, ()))} done={stats['done']} "
+                    f"cancelled={stats['cancelled']} "
+                    f"wait avg/max={stats['wait'] / done * 1000:.0f}/{stats['max_wait'] * 1000:.0f}ms "
+                    f"run avg/max={stats['run'] / done * 1000:.0f}/{stats['max_run'] * 1000:.0f}ms")
+            return "\n".join(lines)
+
+    def _next_task(self):
+        # Called with the lock held; returns None when no panel has a runnable task
+        for offset in range(len(self._panels)):
+            index = (self._turn + offset) % len(self._panels)
+            panel = self._panels[index]
+            queue = self._queues.get(panel)
+            running = self._running[panel]
+            last_idle = sum(self._running.values()) == self._workers - 1
+            if queue and running < self.max_per_panel and not (last_idle and running):
+                self._turn = index + 1
+                self._running[panel] += 1
+                return (panel,) + queue.popleft()
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                item = self._next_task()
+                while item is None and not self._closed:
+                    self._cond.wait()
+                    item = self._next_task()
+                if self._closed:
+                    return
+            panel, task, _, queued_at = item
+
+            started = time.monotonic()
+            try:
+                task()
+            except Exception:
+                traceback.print_exc()
+            finished = time.monotonic()
+
+            with self._cond:
+                self._running[panel] -= 1
+                # A worker may be waiting on this panel's cap
+                self._cond.notify()
+                stats = self._stats[panel]
+                stats["done"] += 1
+                stats["wait"] += started - queued_at
+                stats["max_wait"] = max(stats["max_wait"], started - queued_at)
+                stats["run"] += finished - started
+                stats["max_run"] = max(stats["max_run"], finished - started)
+
+
+class MainLoopWatchdog:
+    """Reports main-loop stalls: a long gap between timer ticks means the loop was blocked.
+
+    A diagnostic, enabled with CONNECTION_CENTRE_WATCHDOG=1. While started
+    it ticks at most every threshold_ms (half of it by default), so any
+    stall longer than threshold_ms (one 60 Hz frame by default) stretches
+    the gap between two ticks past the threshold and is printed; describe()
+    summarises them on exit. The app only runs it while its window is
+    shown and focused, as an idle app should not wake up 125 times a second.
+    """
+
+    def __init__(self, threshold_ms=16, interval_ms=None):
+        self.interval_ms = min(interval_ms or threshold_ms // 2, threshold_ms)
+        self.threshold = threshold_ms / 1000
+        self.stalls = 0
+        self.worst = 0.0
+        self.last_tick = 0.0
+        self.source_id = 0
+
+    def start(self):
+        if not self.source_id:
+            self.last_tick = time.monotonic()
+            self.source_id = GLib.timeout_add(self.interval_ms, self._tick)
+
+    def _tick(self):
+        now = time.monotonic()
+        gap = now - self.last_tick
+        self.last_tick = now
+        if gap > self.threshold:
+            self.stalls += 1
+            self.worst = max(self.worst, gap)
+            print(f"Main loop stalled for up to {gap * 1000:.0f} ms")
+        return GLib.SOURCE_CONTINUE
+
+    def stop(self):
+        if self.source_id:
+            GLib.source_remove(self.source_id)
+            self.source_id = 0
+
+    def describe(self):
+        return f"main loop: {self.stalls} stalls over {self.threshold * 1000:.0f} ms, worst {self.worst * 1000:.0f} ms"
+
+
+class LatestValueWriter:
+    """Coalesces rapid writes (e.g. slider ticks) so only the newest value is sent.
+
+    Each target (a sink, source or sink input) has at most one write in flight.
+    Values set meanwhile overwrite each other, and when the write finishes only
+    the latest one is sent. min_interval optionally caps writes per target.
+    """
+
+    def __init__(self, submit, min_interval=0.05):
+        self._submit = submit  # queues a callable on a background worker
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._pending = {}     # target -> (write, value)
+        self._in_flight = set()
+        self._last_write = {}  # target -> time.monotonic() of its last write
+
+    def set(self, target, value, write):
+        """Records value for target; write(value) runs off the main thread."""
+        with self._lock:
+            self._pending[target] = (write, value)
+            if target in self._in_flight:
+                return
+            self._in_flight.add(target)
+        self._submit(lambda: self._drain(target))
+
+    def _drain(self, target):
+        while True:
+            # Waiting out the rate cap first lets more ticks collapse into one write
+            delay = self._last_write.get(target, 0) + self.min_interval - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            with self._lock:
+                item = self._pending.pop(target, None)
+                if item is None:
+                    self._in_flight.discard(target)
+                    return
+            write, value = item
+            try:
+                write(value)
+            except Exception:
+                # Keep draining: leaving target in _in_flight would strand every later value
+                traceback.print_exc()
+            self._last_write[target] = time.monotonic()
+
+
+# --- Audio Backends ---
+#
+# Every audio query and write goes through one of these, so the panel does not
+# care how the PulseAudio/PipeWire server is reached. "kind" is one of "sink",
+# "source" or "sink-input"; devices are dicts {'name', 'volume', 'muted'} and
+# apps are (name, index, volume) tuples, with volumes in percent. Both take an
+# optional server address (same format as $PULSE_SERVER), which is how a
+# local test server can be used instead of the session one.
+#
+# subscribe(callback) reports server changes as callback(event, facility, index)
+# from a background thread, e.g. ("change", "sink-input", "12"); event is one of
+# "new", "change" or "remove" and facility one of the kinds above or "server".
+# It returns an object whose close() ends the subscription. If the stream ends
+# by itself (the server restarted), on_lost(subscription) is called from the
+# reader thread instead.
+#
+# snapshot() returns the whole server state as an AudioSnapshot in a fixed
+# number of round trips, however many devices and apps there are.
+
+AudioSnapshot = collections.namedtuple("AudioSnapshot", "sinks sources apps default_sink default_source")
+
+class PactlSubscription:
+    """Reads `pactl subscribe` on a daemon thread."""
+
+    EVENT_RE = re.compile(r"Event '(\w+)' on ([\w-]+) #(\d+)")
+
+    def __init__(self, command, callback, on_lost=None):
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        self.callback = callback
+        self.on_lost = on_lost
+        self.closed = False
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            match = self.EVENT_RE.search(line)
+            if match and match.group(2) in ("sink", "source", "sink-input", "server"):
+                self.callback(*match.groups())
+        # pactl exits when the server goes away
+        if not self.closed and self.on_lost:
+            self.on_lost(self)
+
+    def close(self):
+        self.closed = True
+        self.process.terminate()
+
+
+class PulsectlSubscription:
+    """Listens for events on a second native connection (event_listen blocks it)."""
+
+    EVENTS = ("new", "change", "remove")
+    FACILITIES = ("sink", "source", "sink_input", "server")
+
+    def __init__(self, pulsectl, server, callback, on_lost=None):
+        # Without working names no event would match the handlers; fail so the panel polls instead
+        probe = self._names(pulsectl.PulseEventTypeEnum.change, pulsectl.PulseEventFacilityEnum.sink_input)
+        if probe != ("change", "sink-input"):
+            raise pulsectl.PulseError(f"cannot decode pulsectl events (got {probe})")
+        self.pulsectl = pulsectl
+        self.callback = callback
+        self.on_lost = on_lost
+        self.closed = False
+        self.pulse = pulsectl.Pulse("connection-centre-events", server=server)
+        self.pulse.event_mask_set("sink", "source", "sink_input", "server")
+        self.pulse.event_callback_set(self._forward)
+        threading.Thread(target=self._listen, daemon=True).start()
+
+    @classmethod
+    def _names(cls, event_type, facility):
+        """pactl-style names for pulsectl's EnumValues, which have no __str__ but compare equal to their names."""
+        event = next((name for name in cls.EVENTS if event_type == name), None)
+        facility = next((name.replace("_", "-") for name in cls.FACILITIES if facility == name), None)
+        return event, facility
+
+    def _forward(self, ev):
+        event, facility = self._names(ev.t, ev.facility)
+        if event and facility:
+            self.callback(event, facility, str(ev.index))
+
+    def _listen(self):
+        try:
+            self.pulse.event_listen()
+        except self.pulsectl.PulseError as e:
+            # PulseDisconnected when the server restarts
+            print(f"Audio event stream ended: {type(e).__name__}: {e}")
+        finally:
+            self.pulse.close()
+        if not self.closed and self.on_lost:
+            self.on_lost(self)
+
+    def close(self):
+        self.closed = True
+        self.pulse.event_listen_stop()
+
+
+class PactlAudioBackend:
+    """Talks to the audio server by running one pactl process per call."""
+
+    name = "pactl"
+
+    def __init__(self, server=None):
+        self.server = server
+        # Looked up once; the old per-call `which pactl` forked on every query
+        self.pactl_path = shutil.which("pactl")
+        self.json_output = True  # cleared if this pactl predates `-f json`
+
+    def available(self):
+        return self.pactl_path is not None
+
+    def _run(self, args):
+        if not self.pactl_path:
+            return "", "pactl command not found. Is PulseAudio/PipeWire installed?", 127
+        command = [self.pactl_path] + (["-s", self.server] if self.server else []) + args
+        try:
+            result = subprocess.run(command, capture_output=True, text=True, check=True, timeout=3)
+            return result.stdout.strip(), result.stderr.strip(), result.returncode
+        except subprocess.CalledProcessError as e:
+            return "", e.stderr.strip(), e.returncode
+        except subprocess.TimeoutExpired:
+            return "", "pactl command timed out after 3 seconds.", 1
+        except OSError as e:
+            return "", str(e), 1
+
+    def list_devices(self, kind):
+        """Parses `pactl list sinks|sources` into device dicts."""
+        stdout, _, returncode = self._run(["list", kind + "s"])
+        if returncode != 0: return []
+
+        header = "Sink #" if kind == "sink" else "Source #"
+        devices = []
+        current_device = {}
+        for line in stdout.splitlines():
+            line = line.strip()
+            if line.startswith(header):
+                if 'name' in current_device:
+                    devices.append(current_device)
+                current_device = {'index': line.split("#")[1].strip()}
+            elif line.startswith("Name:"):
+                current_device['name'] = line.split(":", 1)[1].strip()
+            elif line.startswith("Volume:"):
+                # Try to find the percentage volume, default to 0
+                match = re.search(r'/\s*(\d+)%', line)
+                current_device['volume'] = int(match.group(1)) if match else 0
+            elif line.startswith("Mute:"):
+                current_device['muted'] = line.split(":", 1)[1].strip().lower() == "yes"
+
+        # Handle the last device
+        if 'name' in current_device:
+            devices.append(current_device)
+        return devices
+
+    def list_apps(self):
+        """Parses `pactl list sink-inputs` into (name, index, volume) tuples."""
+        stdout, _, returncode = self._run(["list", "sink-inputs"])
+        if returncode != 0: return []
+
+        apps = []
+        current_app = {}
+        for line in stdout.splitlines():
+            line = line.strip()
+            if line.startswith("Sink Input #"):
+                # Finalize the previous app
+                if 'index' in current_app:
+                    name = current_app.get('name') or f"App #{current_app['index']}"
+                    apps.append((name, current_app['index'], current_app.get('volume', 0)))
+                # Start the new app
+                current_app = {'index': line.split("#")[1].strip(), 'name': None, 'volume': 0}
+            elif line.startswith("application.name = ") and current_app.get('name') is None:
+                current_app['name'] = line.split("=", 1)[1].strip().strip('"')
+            elif line.startswith("application.process.binary = ") and current_app.get('name') is None:
+                current_app['name'] = line.split("=", 1)[1].strip().strip('"').split("/")[-1]
+            elif line.startswith("Volume:"):
+                match = re.search(r'/\s*(\d+)%', line)
+                current_app['volume'] = int(match.group(1)) if match else 0
+
+        # Handle the last app in the list
+        if 'index' in current_app:
+            name = current_app.get('name') or f"App #{current_app['index']}"
+            apps.append((name, current_app['index'], current_app.get('volume', 0)))
+        return apps
+
+    def _run_json(self, args):
+        stdout, stderr, returncode = self._run(["-f", "json"] + args)
+        if returncode != 0:
+            raise OSError(stderr)
+        return json.loads(stdout)
+
+    @staticmethod
+    def _json_volume(obj):
+        # Same as the text parser: the first channel's percentage
+        channel = next(iter((obj.get("volume") or {}).values()), None)
+        return int(channel["value_percent"].rstrip("%")) if channel else 0
+
+    def snapshot(self):
+        """Four pactl calls with JSON output; the text parsers otherwise."""
+        if self.json_output:
+            try:
+                devices = {}
+                for kind in ("sink", "source"):
+                    devices[kind] = [{'name': d["name"], 'index': str(d["index"]), 'volume': self._json_volume(d),
+                                      'muted': bool(d.get("mute"))} for d in self._run_json(["list", kind + "s"])]
+                apps = []
+                for app in self._run_json(["list", "sink-inputs"]):
+                    props = app.get("properties", {})
+                    name = (props.get("application.name")
+                            or props.get("application.process.binary", "").split("/")[-1]
+                            or f"App #{app['index']}")
+                    apps.append((name, str(app["index"]), self._json_volume(app)))
+                info = self._run_json(["info"])
+                return AudioSnapshot(devices["sink"], devices["source"], apps,
+                                     info.get("default_sink_name"), info.get("default_source_name"))
+            except ValueError as e:
+                print(f"pactl has no usable JSON output, parsing text instead: {e}")
+                self.json_output = False
+            except OSError as e:
+                # A pactl without -f json exits non-zero; if plain pactl still works, that is why
+                if self._run(["info"])[2] == 0:
+                    print(f"pactl rejected JSON output, parsing text instead: {e}")
+                    self.json_output = False
+                else:
+                    print(f"pactl snapshot failed: {e}")
+            except (KeyError, TypeError) as e:
+                print(f"pactl snapshot failed: {e}")
+        return AudioSnapshot(self.list_devices("sink"), self.list_devices("source"), self.list_apps(),
+                             self.get_default("sink"), self.get_default("source"))
+
+    def get_default(self, kind):
+        stdout, _, returncode = self._run([f"get-default-{kind}"])
+        return stdout if returncode == 0 else None
+
+    def set_default(self, kind, name):
+        self._run([f"set-default-{kind}", name])
+
+    def get_volume(self, kind, target):
+        """Returns the volume of target in percent, or None if it is gone."""
+        if kind == "sink-input":
+            # pactl has no get-sink-input-volume; pick the app out of the list instead
+            return next((volume for _, index, volume in self.list_apps() if index == target), None)
+        stdout, _, returncode = self._run([f"get-{kind}-volume", target])
+        match = re.search(r'/\s*(\d+)%', stdout) if returncode == 0 else None
+        return int(match.group(1)) if match else None
+
+    def get_mute(self, kind, target):
+        stdout, _, _ = self._run([f"get-{kind}-mute", target])
+        return stdout.strip().lower().endswith("yes")
+
+    def set_volume(self, kind, target, percent):
+        self._run([f"set-{kind}-volume", target, f"{percent}%"])
+
+    def set_mute(self, kind, target, muted):
+        self._run([f"set-{kind}-mute", target, "1" if muted else "0"])
+
+    def subscribe(self, callback, on_lost=None):
+        if not self.pactl_path:
+            return None
+        return PactlSubscription(
+            [self.pactl_path] + (["-s", self.server] if self.server else []) + ["subscribe"], callback, on_lost)
+
+    def close(self):
+        pass
+
+
+class PulsectlAudioBackend:
+    """Keeps one native-protocol connection to the audio server (needs pulsectl).
+
+    pulsectl objects are not thread-safe, so every call holds a lock; a dropped
+    connection is re-opened once before giving up.
+    """
+
+    name = "pulsectl"
+
+    def __init__(self, server=None):
+        import pulsectl
+        self.pulsectl = pulsectl
+        self.server = server
+        self.lock = threading.Lock()
+        self.pulse = pulsectl.Pulse("connection-centre", server=server)
+
+    def available(self):
+        return True
+
+    def _call(self, action, default=None):
+        with self.lock:
+            for _ in range(2):
+                try:
+                    if self.pulse is None:
+                        self.pulse = self.pulsectl.Pulse("connection-centre", server=self.server)
+                    return action(self.pulse)
+                except self.pulsectl.PulseDisconnected:
+                    # Drop the dead connection; the next attempt (or call) opens a new one
+                    self.pulse.close()
+                    self.pulse = None
+                except self.pulsectl.PulseError as e:
+                    if self.pulse is None:
+                        # Server still restarting; the next call tries again
+                        print(f"Audio server reconnect failed: {e}")
+                    break
+        return default
+
+    @staticmethod
+    def _percent(obj):
+        return round(obj.volume.value_flat * 100)
+
+    def _lookup(self, pulse, kind, target):
+        if kind == "sink":
+            return pulse.get_sink_by_name(target)
+        if kind == "source":
+            return pulse.get_source_by_name(target)
+        return pulse.sink_input_info(int(target))
+
+    def _devices(self, objects):
+        return [{'name': obj.name, 'index': str(obj.index), 'volume': self._percent(obj),
+                 'muted': bool(obj.mute)} for obj in objects]
+
+    def _apps(self, pulse):
+        apps = []
+        for obj in pulse.sink_input_list():
+            name = (obj.proplist.get("application.name")
+                    or obj.proplist.get("application.process.binary", "").split("/")[-1]
+                    or f"App #{obj.index}")
+            apps.append((name, str(obj.index), self._percent(obj)))
+        return apps
+
+    def list_devices(self, kind):
+        return self._call(
+            lambda pulse: self._devices(pulse.sink_list() if kind == "sink" else pulse.source_list()), [])
+
+    def list_apps(self):
+        return self._call(self._apps, [])
+
+    def snapshot(self):
+        def action(pulse):
+            info = pulse.server_info()
+            return AudioSnapshot(self._devices(pulse.sink_list()), self._devices(pulse.source_list()),
+                                 self._apps(pulse), info.default_sink_name, info.default_source_name)
+        return self._call(action, AudioSnapshot([], [], [], None, None))
+
+    def get_default(self, kind):
+        def action(pulse):
+            info = pulse.server_info()
+            return info.default_sink_name if kind == "sink" else info.default_source_name
+        return self._call(action)
+
+    def set_default(self, kind, name):
+        self._call(lambda pulse: pulse.default_set(self._lookup(pulse, kind, name)))
+
+    def get_volume(self, kind, target):
+        return self._call(lambda pulse: self._percent(self._lookup(pulse, kind, target)))
+
+    def get_mute(self, kind, target):
+        return self._call(lambda pulse: bool(self._lookup(pulse, kind, target).mute), False)
+
+    def set_volume(self, kind, target, percent):
+        self._call(lambda pulse: pulse.volume_set_all_chans(self._lookup(pulse, kind, target), percent / 100))
+
+    def set_mute(self, kind, target, muted):
+        self._call(lambda pulse: pulse.mute(self._lookup(pulse, kind, target), muted))
+
+    def subscribe(self, callback, on_lost=None):
+        try:
+            return PulsectlSubscription(self.pulsectl, self.server, callback, on_lost)
+        except self.pulsectl.PulseError as e:
+            print(f"Audio events unavailable: {e}")
+            return None
+
+    def close(self):
+        with self.lock:
+            if self.pulse is not None:
+                self.pulse.close()
+
+
+def make_audio_backend(server=None):
+    """The native backend when pulsectl is installed and connects, else pactl."""
+    try:
+        return PulsectlAudioBackend(server)
+    except Exception as e:
+        # ImportError, or pulsectl.PulseError when the server is unreachable
+        print(f"Using pactl for audio ({type(e).__name__}: {e})")
+        return PactlAudioBackend(server)
+
+
+def run_command(command, timeout=10):
+    """Runs one command; returns (stdout, stderr, returncode) and never raises."""
+    try:
+        result = subprocess.run(
+            command,
+            capture_output=True, text=True, check=True, timeout=timeout
+        )
+        return result.stdout.strip(), result.stderr.strip(), result.returncode
+    except subprocess.CalledProcessError as e:
+        return "", e.stderr.strip(), e.returncode
+    except FileNotFoundError:
+        return "", f"{command[0]} command not found.", 127
+    except subprocess.TimeoutExpired:
+        return "", f"{command[0]} command timed out after {timeout} seconds.", 1
+    except Exception as e:
+        return "", str(e), 1
+
+
+def run_commands(commands, timeout=10):
+    """Runs several commands at once; returns one (stdout, stderr, returncode) per command."""
+    processes = []
+    for command in commands:
+        try:
+            processes.append(subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True))
+        except FileNotFoundError:
+            processes.append(("", f"{command[0]} command not found.", 127))
+        except Exception as e:
+            processes.append(("", str(e), 1))
+
+    deadline = time.monotonic() + timeout
+    results = []
+    for command, process in zip(commands, processes):
+        if isinstance(process, tuple):
+            results.append(process)
+            continue
+        try:
+            stdout, stderr = process.communicate(timeout=max(0, deadline - time.monotonic()))
+            results.append((stdout.strip() if process.returncode == 0 else "", stderr.strip(), process.returncode))
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            results.append(("", f"{command[0]} command timed out after {timeout} seconds.", 1))
+    return results
+
+
+# --- Wi-Fi Backends ---
+#
+# The Wi-Fi panel reaches NetworkManager through one of these. status() returns
+# (devices, radio_enabled, active_connections) where devices are
+# (device, type, state, connection) tuples and active connections are dicts
+# {'type', 'device', 'name', 'uuid'}; access_points() returns
+# (ssid, signal, security) tuples from NetworkManager's last scan without
+# waiting for a new one; request_scan() asks for a fresh scan and returns as
+# soon as it has been accepted. Actions return None on success or an error
+# message. connect() brings saved profiles up as they are and only writes a
+# profile when the SSID has none or the password differs; the saved-profile
+# index behind that is rebuilt after invalidate_profiles().
+#
+# subscribe(callback) calls callback(reason) on the main loop whenever
+# NetworkManager reports a change, reason being "status", "access-points" or
+# "profiles"; it returns None when the backend cannot push changes, in which
+# case the panel keeps polling.
+
+class NmcliWifiBackend:
+    """Runs nmcli for every query and parses its terse output."""
+
+    name = "nmcli"
+
+    ACTIVE_CONNECTIONS_COMMAND = ["nmcli", "-t", "-f", "TYPE,DEVICE,NAME,UUID", "connection", "show", "--active"]
+
+    def __init__(self):
+        self._interface = None
+        self._profiles = None  # SSID -> profile UUID; None until the next lookup rebuilds it
+
+    def radio_enabled(self):
+        stdout, _, _ = run_command(["nmcli", "radio", "wifi"], timeout=3)
+        return stdout.lower() == "enabled"
+
+    def set_radio(self, enabled):
+        _, stderr, returncode = run_command(["nmcli", "radio", "wifi", "on" if enabled else "off"], timeout=5)
+        return None if returncode == 0 else stderr
+
+    def _parse_active_connections(self, stdout):
+        connections = []
+        for line in stdout.split("\n"):
+            if line:
+                parts = line.split(":")
+                if len(parts) >= 4:
+                    connections.append({
+                        "type": parts[0], 
+                        "device": parts[1], 
+                        "name": parts[2], 
+                        "uuid": parts[3]
+                    })
+        return connections
+
+    def status(self):
+        # The three queries are independent, so their processes run side by side
+        (device_out, _, _), (radio_out, _, _), (active_out, _, _) = run_commands([
+            ["nmcli", "-t", "-f", "DEVICE,TYPE,STATE,CONNECTION", "device"],
+            ["nmcli", "radio", "wifi"],
+            self.ACTIVE_CONNECTIONS_COMMAND,
+        ], timeout=5)
+        devices = []
+        for line in device_out.split("\n"):
+            if line:
+                parts = line.split(":")
+                devices.append(tuple((parts + [""] * 4)[:4]))
+        return devices, radio_out.lower() == "enabled", self._parse_active_connections(active_out)
+
+    def active_connections(self):
+        stdout, _, _ = run_command(self.ACTIVE_CONNECTIONS_COMMAND, timeout=5)
+        return self._parse_active_connections(stdout)
+
+    def access_points(self):
+        # --rescan no lists what NetworkManager already knows instead of blocking on a scan
+        stdout, _, _ = run_command(
+            ["nmcli", "-t", "-f", "SSID,SIGNAL,SECURITY", "device", "wifi", "list", "--rescan", "no"], timeout=3)
+        networks = []
+        for line in stdout.split("\n"):
+            if line:
+                # Use regex to find the signal percentage and security (never has colons) at the end
+                match = re.search(r':(\d+):([^:]*)$', line)
+                if match:
+                    # FIX: Robustly determine the SSID by taking the substring before the signal percentage match
+                    # This prevents SSIDs with colons from breaking the parsing
+                    security = "" if match.group(2) in ("", "--") else match.group(2)
+                    networks.append((line[:match.start()].strip(), int(match.group(1)), security))
+        return networks
+
+    def request_scan(self):
+        _, stderr, returncode = run_command(["nmcli", "device", "wifi", "rescan"], timeout=10)
+        return None if returncode == 0 else stderr
+
+    def wifi_interface(self):
+        if self._interface is None:
+            stdout, _, _ = run_command(["nmcli", "-t", "-f", "DEVICE,TYPE", "device"], timeout=3)
+            self._interface = next((line.split(":")[0] for line in stdout.split("\n") if ":wifi" in line), None)
+        return self._interface
+
+    def saved_profiles(self):
+        """SSID -> UUID of the saved Wi-Fi profiles, built with two nmcli calls and cached."""
+        if self._profiles is None:
+            # --escape no: terse output otherwise backslash-escapes ':' and '\\' in values
+            stdout, _, _ = run_command(["nmcli", "-t", "--escape", "no", "-f", "UUID,TYPE", "connection", "show"],
+                                       timeout=5)
+            uuids = [line.split(":")[0] for line in stdout.split("\n") if line.endswith(":802-11-wireless")]
+            profiles = {}
+            if uuids:
+                stdout, _, _ = run_command(["nmcli", "-t", "--escape", "no", "-f", "connection.uuid,802-11-wireless.ssid",
+                                            "connection", "show"] + uuids, timeout=5)
+                uuid = None
+                for line in stdout.split("\n"):
+                    field, _, value = line.partition(":")
+                    if field == "connection.uuid":
+                        uuid = value
+                    elif field == "802-11-wireless.ssid" and uuid:
+                        profiles[value] = uuid
+            self._profiles = profiles
+        return self._profiles
+
+    def invalidate_profiles(self):
+        self._profiles = None
+
+    def connect(self, ssid, password):
+        uuid = self.saved_profiles().get(ssid)
+        if uuid is not None:
+            # Fast path: bring the saved profile up, touching it only if the password changed
+            if password:
+                stored, _, _ = run_command(["nmcli", "-s", "--escape", "no", "-g", "802-11-wireless-security.psk",
+                                            "connection", "show", uuid], timeout=5)
+                if stored != password:
+                    _, stderr, returncode = run_command(["nmcli", "connection", "modify", uuid,
+                                                         "wifi-sec.key-mgmt", "wpa-psk", "wifi-sec.psk", password],
+                                                        timeout=10)
+                    if returncode != 0:
+                        return f"Failed to update profile: {stderr}"
+            _, stderr, returncode = run_command(["nmcli", "connection", "up", uuid], timeout=20)
+            if returncode == 0:
+                return None
+            if "unknown connection" not in stderr.lower():
+                return f"Failed to connect: {stderr}"
+            # Deleted behind our back; fall through and create it again
+            self.invalidate_profiles()
+
+        if not password:
+            return f"Enter a password for {ssid}."
+        wifi_iface = self.wifi_interface()
+        if not wifi_iface:
+            return "No Wi-Fi interface found."
+
+        # Replace any old connection profile with the same name
+        run_command(["nmcli", "connection", "delete", ssid], timeout=5)
+        create_cmd = ["nmcli", "connection", "add", "type", "wifi", "ifname", wifi_iface,
+                      "con-name", ssid, "ssid", ssid, "wifi-sec.key-mgmt", "wpa-psk", "wifi-sec.psk", password]
+        _, stderr, returncode = run_command(create_cmd, timeout=10)
+        self.invalidate_profiles()
+        if returncode != 0:
+            return f"Failed to create profile: {stderr}"
+
+        _, stderr, returncode = run_command(["nmcli", "connection", "up", ssid], timeout=20)
+        return None if returncode == 0 else f"Failed to connect: {stderr}"
+
+    def disconnect(self, uuid):
+        _, stderr, returncode = run_command(["nmcli", "connection", "down", uuid], timeout=10)
+        return None if returncode == 0 else stderr
+
+    def forget(self, uuid):
+        _, stderr, returncode = run_command(["nmcli", "connection", "delete", uuid], timeout=10)
+        self.invalidate_profiles()
+        return None if returncode == 0 else stderr
+
+    def subscribe(self, callback):
+        return None
+
+    def close(self):
+        pass
+
+
+NM_BUS_NAME = "org.freedesktop.NetworkManager"
+NM_PATH = "/org/freedesktop/NetworkManager"
+NM_SETTINGS_PATH = "/org/freedesktop/NetworkManager/Settings"
+NM_IFACE = "org.freedesktop.NetworkManager"
+DBUS_PROPERTIES_IFACE = "org.freedesktop.DBus.Properties"
+
+
+class DBusSubscription:
+    """A set of D-Bus signal subscriptions that close() removes together."""
+
+    def __init__(self, bus, ids):
+        self.bus = bus
+        self.ids = ids
+
+    def close(self):
+        for subscription_id in self.ids:
+            self.bus.signal_unsubscribe(subscription_id)
+        self.ids = []
+
+
+class NetworkManagerDBusBackend:
+    """Talks to NetworkManager directly over D-Bus, with no process spawns.
+
+    Calls are synchronous and meant for worker threads; GDBus connections are
+    thread-safe. bus_address selects a bus other than the system bus, such as
+    one running a fake NetworkManager for tests.
+    """
+
+    name = "dbus"
+
+    DEVICE_TYPES = {1: "ethernet", 2: "wifi", 5: "bt", 14: "generic", 29: "wireguard", 30: "wifi-p2p"}
+    DEVICE_STATES = {10: "unmanaged", 20: "unavailable", 30: "disconnected", 40: "connecting (prepare)",
+                     50: "connecting (configuring)", 60: "connecting (need authentication)",
+                     70: "connecting (getting IP configuration)", 80: "connecting (checking IP connectivity)",
+                     90: "connecting (starting secondary connections)", 100: "connected",
+                     110: "deactivating", 120: "failed"}
+    CONNECTION_TYPES = {"802-11-wireless": "wifi", "802-3-ethernet": "ethernet"}
+    ACTIVATED, DEACTIVATED = 2, 4  # NMActiveConnectionState values
+
+    def __init__(self, bus_address=None):
+        if bus_address:
+            self.bus = Gio.DBusConnection.new_for_address_sync(
+                bus_address,
+                Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+                None, None)
+        else:
+            self.bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+        self._wifi_device = None
+        self._profiles = None  # SSID -> settings path; None until the next lookup rebuilds it
+        # Fails with GLib.Error when NetworkManager is not on the bus
+        self._get_all(NM_PATH, NM_IFACE)
+
+    def _call(self, path, iface, method, args=None, reply_type=None, timeout_ms=10000):
+        result = self.bus.call_sync(
+            NM_BUS_NAME, path, iface, method, args,
+            GLib.VariantType.new(reply_type) if reply_type else None,
+            Gio.DBusCallFlags.NONE, timeout_ms, None)
+        return result.unpack() if result is not None else ()
+
+    def _get_all(self, path, iface):
+        return self._call(path, DBUS_PROPERTIES_IFACE, "GetAll", GLib.Variant("(s)", (iface,)), "(a{sv})")[0]
+
+    def _devices(self):
+        return self._call(NM_PATH, NM_IFACE, "GetDevices", None, "(ao)")[0]
+
+    def _wifi(self):
+        """(device path, interface name) of the first Wi-Fi device, cached."""
+        if self._wifi_device is None:
+            for path in self._devices():
+                props = self._get_all(path, NM_IFACE + ".Device")
+                if props.get("DeviceType") == 2:
+                    self._wifi_device = (path, props.get("Interface"))
+                    break
+        return self._wifi_device or (None, None)
+
+    def radio_enabled(self):
+        return bool(self._get_all(NM_PATH, NM_IFACE).get("WirelessEnabled"))
+
+    def set_radio(self, enabled):
+        try:
+            self._call(NM_PATH, DBUS_PROPERTIES_IFACE, "Set",
+                       GLib.Variant("(ssv)", (NM_IFACE, "WirelessEnabled", GLib.Variant("b", enabled))))
+        except GLib.Error as e:
+            return e.message
+        return None
+
+    def _connection_id(self, active_path):
+        if not active_path or active_path == "/":
+            return ""
+        try:
+            return self._get_all(active_path, NM_IFACE + ".Connection.Active").get("Id", "")
+        except GLib.Error:
+            return ""
+
+    def status(self):
+        devices = []
+        for path in self._devices():
+            try:
+                props = self._get_all(path, NM_IFACE + ".Device")
+            except GLib.Error:
+                continue  # Removed while we were listing
+            devices.append((
+                props.get("Interface", ""),
+                self.DEVICE_TYPES.get(props.get("DeviceType"), "unknown"),
+                self.DEVICE_STATES.get(props.get("State"), "unknown"),
+                self._connection_id(props.get("ActiveConnection")),
+            ))
+        return devices, self.radio_enabled(), self.active_connections()
+
+    def active_connections(self):
+        connections = []
+        for path in self._get_all(NM_PATH, NM_IFACE).get("ActiveConnections", []):
+            try:
+                props = self._get_all(path, NM_IFACE + ".Connection.Active")
+                device_paths = props.get("Devices") or []
+                device = self._get_all(device_paths[0], NM_IFACE + ".Device").get("Interface", "") if device_paths else ""
+            except GLib.Error:
+                continue
+            connections.append({
+                "type": self.CONNECTION_TYPES.get(props.get("Type"), props.get("Type", "")),
+                "device": device,
+                "name": props.get("Id", ""),
+                "uuid": props.get("Uuid", ""),
+            })
+        return connections
+
+    def access_points(self):
+        device, _ = self._wifi()
+        if device is None:
+            return []
+        networks = []
+        for path in self._call(device, NM_IFACE + ".Device.Wireless", "GetAllAccessPoints", None, "(ao)")[0]:
+            try:
+                props = self._get_all(path, NM_IFACE + ".AccessPoint")
+            except GLib.Error:
+                continue
+            ssid = bytes(props.get("Ssid", [])).decode("utf-8", "replace")
+            networks.append((ssid, props.get("Strength", 0), self._security(props)))
+        # Strongest first, as nmcli lists them
+        networks.sort(key=lambda network: -network[1])
+        return networks
+
+    def request_scan(self):
+        device, _ = self._wifi()
+        if device is None:
+            return "No Wi-Fi interface found."
+        try:
+            # Returns once the scan is queued; new APs arrive as AccessPointAdded signals
+            self._call(device, NM_IFACE + ".Device.Wireless", "RequestScan", GLib.Variant("(a{sv})", ({},)))
+        except GLib.Error as e:
+            return e.message
+        return None
+
+    @staticmethod
+    def _security(props):
+        """nmcli-style security summary from the AccessPoint flag properties."""
+        wpa_flags, rsn_flags = props.get("WpaFlags", 0), props.get("RsnFlags", 0)
+        # Same tests as nmcli, on the NM_802_11_AP_SEC_KEY_MGMT_* bits only
+        parts = []
+        if props.get("Flags", 0) & 0x1 and not (wpa_flags or rsn_flags):
+            parts.append("WEP")
+        if wpa_flags:
+            parts.append("WPA1")
+        if rsn_flags & (0x100 | 0x200):  # PSK, 802_1X
+            parts.append("WPA2")
+        if rsn_flags & 0x400:  # SAE
+            parts.append("WPA3")
+        if rsn_flags & (0x800 | 0x1000):  # OWE, OWE_TM
+            parts.append("OWE")
+        if (wpa_flags | rsn_flags) & 0x200:  # 802_1X
+            parts.append("802.1X")
+        return " ".join(parts)
+
+    def wifi_interface(self):
+        return self._wifi()[1]
+
+    def _find_settings(self, match):
+        """Paths of saved connection profiles whose settings satisfy match(settings)."""
+        paths = []
+        for path in self._call(NM_SETTINGS_PATH, NM_IFACE + ".Settings", "ListConnections", None, "(ao)")[0]:
+            try:
+                settings = self._call(path, NM_IFACE + ".Settings.Connection", "GetSettings", None, "(a{sa{sv}})")[0]
+            except GLib.Error:
+                continue
+            if match(settings):
+                paths.append(path)
+        return paths
+
+    def saved_profiles(self):
+        """SSID -> settings path of the saved Wi-Fi profiles, cached until invalidate_profiles()."""
+        if self._profiles is None:
+            profiles = {}
+            for path in self._find_settings(lambda settings: "802-11-wireless" in settings):
+                try:
+                    settings = self._call(path, NM_IFACE + ".Settings.Connection", "GetSettings", None,
+                                          "(a{sa{sv}})")[0]
+                except GLib.Error:
+                    continue
+                ssid = bytes(settings["802-11-wireless"].get("ssid", [])).decode("utf-8", "replace")
+                profiles[ssid] = path
+            self._profiles = profiles
+        return self._profiles
+
+    def invalidate_profiles(self):
+        self._profiles = None
+
+    def _stored_psk(self, path):
+        try:
+            secrets = self._call(path, NM_IFACE + ".Settings.Connection", "GetSecrets",
+                                 GLib.Variant("(s)", ("802-11-wireless-security",)), "(a{sa{sv}})")[0]
+        except GLib.Error:
+            return None  # No secret agent access
+        # None too when an agent owns the secret instead of NetworkManager
+        return secrets.get("802-11-wireless-security", {}).get("psk")
+
+    def _update_psk(self, path, password):
+        """Sets only the psk of a saved profile with Update2, keeping every other setting."""
+        current = self.bus.call_sync(
+            NM_BUS_NAME, path, NM_IFACE + ".Settings.Connection", "GetSettings", None,
+            GLib.VariantType.new("(a{sa{sv}})"), Gio.DBusCallFlags.NONE, 10000, None).get_child_value(0)
+        # Rebuilt from the raw variants so every value keeps its D-Bus type
+        settings = {}
+        for i in range(current.n_children()):
+            group = current.get_child_value(i)
+            values = group.get_child_value(1)
+            settings[group.get_child_value(0).get_string()] = {
+                entry.get_child_value(0).get_string(): entry.get_child_value(1).get_variant()
+                for entry in (values.get_child_value(j) for j in range(values.n_children()))}
+        security = settings.setdefault("802-11-wireless-security", {})
+        security.setdefault("key-mgmt", GLib.Variant("s", "wpa-psk"))
+        security["psk"] = GLib.Variant("s", password)
+        self._call(path, NM_IFACE + ".Settings.Connection", "Update2",
+                   GLib.Variant("(a{sa{sv}}ua{sv})", (settings, 0x1, {})))  # NM_SETTINGS_UPDATE2_FLAG_TO_DISK
+
+    def _activate(self, path, device):
+        active = self._call(NM_PATH, NM_IFACE, "ActivateConnection",
+                            GLib.Variant("(ooo)", (path, device, "/")), "(o)")[0]
+        return self._wait_for_activation(active)
+
+    def connect(self, ssid, password):
+        device, _ = self._wifi()
+        if device is None:
+            return "No Wi-Fi interface found."
+        path = self.saved_profiles().get(ssid)
+        if path is not None:
+            # Fast path: activate the saved profile, touching only its psk when the password changed
+            stored = self._stored_psk(path) if password else None
+            try:
+                if stored is not None and stored != password:
+                    self._update_psk(path, password)
+                error = self._activate(path, device)
+                if error and password and stored is None:
+                    # The secret we could not read may be the stale one; store the typed password and retry
+                    self._update_psk(path, password)
+                    error = self._activate(path, device)
+            except GLib.Error as e:
+                self.invalidate_profiles()  # The profile may have gone away meanwhile
+                return f"Failed to connect: {e.message}"
+            return error
+
+        if not password:
+            return f"Enter a password for {ssid}."
+        self.invalidate_profiles()
+        try:
+            # Replace any old connection profile with the same name
+            for stale_path in self._find_settings(lambda settings: settings.get("connection", {}).get("id") == ssid):
+                self._call(stale_path, NM_IFACE + ".Settings.Connection", "Delete")
+
+            settings = {
+                "connection": {"id": GLib.Variant("s", ssid), "type": GLib.Variant("s", "802-11-wireless")},
+                "802-11-wireless": {"ssid": GLib.Variant("ay", ssid.encode())},
+                "802-11-wireless-security": {"key-mgmt": GLib.Variant("s", "wpa-psk"),
+                                             "psk": GLib.Variant("s", password)},
+            }
+            _, active = self._call(NM_PATH, NM_IFACE, "AddAndActivateConnection",
+                                   GLib.Variant("(a{sa{sv}}oo)", (settings, device, "/")), "(oo)")
+        except GLib.Error as e:
+            return f"Failed to create profile: {e.message}"
+        return self._wait_for_activation(active)
+
+    def _wait_for_activation(self, active_path, timeout=20):
+        """Blocks until an activation finishes, like `nmcli connection up` does."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                state = self._get_all(active_path, NM_IFACE + ".Connection.Active").get("State")
+            except GLib.Error:
+                return "Failed to connect: the connection was deactivated."
+            if state == self.ACTIVATED:
+                return None
+            if state == self.DEACTIVATED:
+                return "Failed to connect: the connection was deactivated."
+            time.sleep(0.25)
+        return f"Failed to connect: timed out after {timeout} seconds."
+
+    def disconnect(self, uuid):
+        try:
+            for path in self._get_all(NM_PATH, NM_IFACE).get("ActiveConnections", []):
+                if self._get_all(path, NM_IFACE + ".Connection.Active").get("Uuid") == uuid:
+                    self._call(NM_PATH, NM_IFACE, "DeactivateConnection", GLib.Variant("(o)", (path,)))
+                    return None
+        except GLib.Error as e:
+            return e.message
+        return "Connection is not active."
+
+    def forget(self, uuid):
+        try:
+            path = self._call(NM_SETTINGS_PATH, NM_IFACE + ".Settings", "GetConnectionByUuid",
+                              GLib.Variant("(s)", (uuid,)), "(o)")[0]
+            self._call(path, NM_IFACE + ".Settings.Connection", "Delete")
+        except GLib.Error as e:
+            return e.message
+        finally:
+            self.invalidate_profiles()
+        return None
+
+    def subscribe(self, callback):
+        """Forwards NetworkManager signals to callback(reason); call on the main thread."""
+        def on_signal(connection, sender, path, iface, signal, params):
+            if signal in ("AccessPointAdded", "AccessPointRemoved"):
+                callback("access-points")
+            elif signal in ("NewConnection", "ConnectionRemoved", "Updated"):
+                callback("profiles")
+            elif iface == DBUS_PROPERTIES_IFACE and params[0] == NM_IFACE + ".AccessPoint":
+                # Signal strength ticks; the list updates those rows in place
+                callback("access-points")
+            else:
+                callback("status")
+
+        ids = []
+        for iface, member in ((NM_IFACE, "StateChanged"),
+                              (DBUS_PROPERTIES_IFACE, "PropertiesChanged"),
+                              (NM_IFACE + ".Device.Wireless", "AccessPointAdded"),
+                              (NM_IFACE + ".Device.Wireless", "AccessPointRemoved"),
+                              (NM_IFACE + ".Connection.Active", "StateChanged"),
+                              (NM_IFACE + ".Settings", "NewConnection"),
+                              (NM_IFACE + ".Settings", "ConnectionRemoved"),
+                              (NM_IFACE + ".Settings.Connection", "Updated")):
+            ids.append(self.bus.signal_subscribe(
+                NM_BUS_NAME, iface, member, None, None, Gio.DBusSignalFlags.NONE, on_signal))
+        return DBusSubscription(self.bus, ids)
+
+    def close(self):
+        pass
+
+
+def make_wifi_backend(bus_address=None):
+    """The D-Bus backend when NetworkManager answers on the bus, else nmcli."""
+    try:
+        return NetworkManagerDBusBackend(bus_address)
+    except GLib.Error as e:
+        print(f"Using nmcli for Wi-Fi ({e.message})")
+        return NmcliWifiBackend()
 
 
 class ConnectionCentreApp(Gtk.Application):
+    MIN_RESCAN_INTERVAL = 15                 # Seconds between Wi-Fi rescans, however often Scan is clicked
+    RESCAN_POLL_MS = (1500, 3000, 5000, 8000)  # Re-lists after a rescan when the backend cannot push
+
     def __init__(self):
         super().__init__(application_id="org.connectioncentre.app", 
                          flags=0)
         # Global job tracker
         self.refresh_jobs = {}
+        self.watchdog = None              # MainLoopWatchdog when CONNECTION_CENTRE_WATCHDOG is set
+        # Every background task runs on this shared pool instead of its own thread
+        self.task_pool = TaskPool(workers=4)
+        # Slider drags send only their latest volume, at most ~20 writes/s per target
+        self.volume_writer = LatestValueWriter(
+            lambda task: self._safe_thread_start(target=task, panel_name="audio"), min_interval=0.05)
         
         # Initialize data storage lists/variables
         self.connected_networks_data = [] # For WiFi/Ethernet connections
@@ -34,6 +1201,26 @@ class ConnectionCentreApp(Gtk.Application):
         self.device_widgets = []          # For Audio sink/source dynamic widgets
         self.app_widgets = []             # For Audio application dynamic widgets
         self.bt_adapter_mac = None        # Bluetooth adapter MAC address
+        self.wifi_status = None           # (status lines, radio on, active connections) on screen
+        self.status_paused = False        # Set while speedtest results are on screen
+        # NetworkManager over D-Bus when possible; CONNECTION_CENTRE_NM_BUS_ADDRESS selects another bus
+        self.wifi = make_wifi_backend(os.environ.get("CONNECTION_CENTRE_NM_BUS_ADDRESS"))
+        self.wifi_subscription = None     # Pushes NetworkManager changes; None means poll
+        self.wifi_event_reasons = set()   # Reasons collected since the last debounced refresh
+        self.wifi_event_source = 0
+        self.wifi_rows = {}               # SSID -> ListItemRow in wifi_networks_listbox
+        self.wifi_scan_cache = None       # (time.monotonic(), networks) of the last scan
+        self.wifi_last_rescan = None      # time.monotonic() of the last rescan request
+        # Swappable audio backend; CONNECTION_CENTRE_PULSE_SERVER points it at another server
+        self.audio = make_audio_backend(os.environ.get("CONNECTION_CENTRE_PULSE_SERVER"))
+        self.audio_subscription = None    # Live while the audio panel is shown
+        self.audio_events = set()         # (event, facility, index) not yet handled
+        self.audio_events_lock = threading.Lock()
+        self.audio_device_names = {}      # (kind, index) -> sink/source name
+        self.audio_defaults = {}          # "sink"/"source" -> default device name
+        self.audio_snapshot = None        # AudioSnapshot the widgets currently show
+        self.audio_subscribed_at = 0.0    # time.monotonic() of the last subscribe
+        self.audio_resubscribe_delay = 1  # Seconds; doubles while the server keeps dropping us
 
 
     def do_activate(self):
@@ -148,6 +1335,14 @@ class ConnectionCentreApp(Gtk.Application):
 
         # Show the window
         self.win.present()
+        if os.environ.get("CONNECTION_CENTRE_WATCHDOG"):
+            # Opt-in diagnostic; only ticks while the window is shown and focused
+            self.watchdog = MainLoopWatchdog()
+            self.win.connect("notify::is-active", self._update_watchdog)
+            self.win.connect("notify::visible", self._update_watchdog)
+            self._update_watchdog()
+        # Subscribed here so the signal callbacks run on the main loop
+        self.wifi_subscription = self.wifi.subscribe(self._on_wifi_event)
         
         # Initialize default view
         self.show_panel("wifi")
@@ -172,8 +1367,12 @@ class ConnectionCentreApp(Gtk.Application):
                  
         GLib.idle_add(update)
         
-    def _safe_thread_start(self, target, args=(), kwargs={}, panel_name="wifi"):
-        """Wraps a target function with exception handling before running it in a thread."""
+    def _safe_thread_start(self, target, args=(), kwargs={}, panel_name="wifi", cancellable=False):
+        """Wraps a target function with exception handling and queues it on the task pool.
+
+        Refreshes should pass cancellable=True so they are dropped when the user
+        leaves their panel; user actions (connect, volume, ...) always run.
+        """
         
         def safe_wrapper():
             try:
@@ -184,13 +1383,29 @@ class ConnectionCentreApp(Gtk.Application):
                 error_msg = f"Uncaught exception in background thread '{target.__name__}': {e}\n{traceback.format_exc()}"
                 self._log_error_to_ui(error_msg, panel_name)
 
-        # CRITICAL: Use the safe wrapper to start the thread
-        threading.Thread(target=safe_wrapper, daemon=True).start()
+        # CRITICAL: Use the safe wrapper, on a pool worker instead of a new thread
+        self.task_pool.submit(panel_name, safe_wrapper, cancellable)
     
+    def _update_watchdog(self, *args):
+        if self.win.get_visible() and self.win.is_active():
+            self.watchdog.start()
+        else:
+            self.watchdog.stop()
+
     def on_closing(self, win):
         """Safely shuts down the application by canceling all GLib jobs."""
         print("Shutting down... canceling background jobs.")
         self.stop_refresh_jobs()
+        self._stop_audio_events()
+        if self.wifi_subscription is not None:
+            self.wifi_subscription.close()
+        self.wifi.close()
+        print(f"Background task stats:\n{self.task_pool.describe()}")
+        if self.watchdog is not None:
+            self.watchdog.stop()
+            print(self.watchdog.describe())
+        self.task_pool.shutdown()
+        self.audio.close()
         # Returning False allows the window to close normally after cleanup.
         return False 
         
@@ -205,34 +1420,30 @@ class ConnectionCentreApp(Gtk.Application):
         """Handles switching panels and stopping old jobs."""
         print(f"Switching to {panel_name} panel.")
         self.stop_refresh_jobs()
+        # Refreshes still queued for the panel being left are no longer useful
+        previous_panel = self.stack.get_visible_child_name()
+        if previous_panel != panel_name:
+            self.task_pool.cancel(previous_panel)
+        if panel_name != "audio":
+            self._stop_audio_events()
         self.stack.set_visible_child_name(panel_name)
 
         if panel_name == "wifi":
             # Start status refresh loop
             self.refresh_status() 
+            if self.wifi_networks_listbox.get_sensitive():
+                # Events were ignored while away: re-list now (cached rows first) and rescan
+                self.perform_wifi_scan()
         elif panel_name == "bluetooth":
             # Start status refresh loop
             self.refresh_bt_status()
         elif panel_name == "audio":
             # Start initial data load in a thread
-            self._safe_thread_start(target=self._load_audio_panel_thread, panel_name="audio")
+            self._safe_thread_start(target=self._load_audio_panel_thread, panel_name="audio", cancellable=True)
             
     def _run_subprocess(self, command, timeout=10):
         """Helper to safely run subprocess commands."""
-        try:
-            result = subprocess.run(
-                command,
-                capture_output=True, text=True, check=True, timeout=timeout
-            )
-            return result.stdout.strip(), result.stderr.strip(), result.returncode
-        except subprocess.CalledProcessError as e:
-            return "", e.stderr.strip(), e.returncode
-        except FileNotFoundError:
-            return "", f"{command[0]} command not found.", 127
-        except subprocess.TimeoutExpired:
-            return "", f"{command[0]} command timed out after {timeout} seconds.", 1
-        except Exception as e:
-            return "", str(e), 1
+        return run_command(command, timeout)
             
     def _update_status_text(self, text, clear=False):
         """Helper to safely update the WiFi status Gtk.TextView."""
@@ -260,25 +1471,22 @@ class ConnectionCentreApp(Gtk.Application):
                 self.bt_status_listbox.remove(self.bt_status_listbox.get_row_at_index(0))
         GLib.idle_add(update)
 
-    # --- WIFI Backend Methods (nmcli) ---
+    # --- WIFI Backend Methods (self.wifi, see make_wifi_backend) ---
     
     def get_wifi_radio_status(self):
         """Checks the global Wi-Fi radio state (enabled/disabled)."""
-        stdout, _, _ = self._run_subprocess(["nmcli", "radio", "wifi"], timeout=3)
-        return stdout.lower() == "enabled"
+        return self.wifi.radio_enabled()
 
     def toggle_wifi_radio(self):
         """Toggles the global Wi-Fi radio."""
         is_enabled = self.get_wifi_radio_status()
-        action = "off" if is_enabled else "on"
-        
-        stdout, stderr, returncode = self._run_subprocess(["nmcli", "radio", "wifi", action], timeout=5)
+        error = self.wifi.set_radio(not is_enabled)
 
-        if returncode == 0:
-            new_state = "DISABLED" if action == "off" else "ENABLED"
+        if error is None:
+            new_state = "DISABLED" if is_enabled else "ENABLED"
             self._update_status_text(f"📶 Wi-Fi radio successfully set to {new_state}.")
         else:
-            self._update_status_text(f"❌ Failed to toggle Wi-Fi: {stderr}")
+            self._update_status_text(f"❌ Failed to toggle Wi-Fi: {error}")
             
         # Always refresh the UI after a toggle attempt
         self.refresh_wifi_ui_on_toggle(do_scan=True)
@@ -286,57 +1494,39 @@ class ConnectionCentreApp(Gtk.Application):
     def refresh_wifi_ui_on_toggle(self, do_scan=True):
         """Updates the toggle button and the network listbox state."""
         is_enabled = self.get_wifi_radio_status()
-        
-        def update_gui():
-            if is_enabled:
-                self.wifi_toggle_button.set_label("Wi-Fi: ON")
-                self.wifi_toggle_button.set_css_classes(['wifi-on'])
-                self.wifi_networks_listbox.set_sensitive(True)
-            else:
-                self.wifi_toggle_button.set_label("Wi-Fi: OFF")
-                self.wifi_toggle_button.set_css_classes(['wifi-off'])
-                
-                # Clear and disable listbox when radio is off
-                self._clear_container(self.wifi_networks_listbox)
-                self._add_listbox_item(self.wifi_networks_listbox, "Wi-Fi radio is OFF. Toggle ON to scan.")
-                self.wifi_networks_listbox.set_sensitive(False) 
-                
-            # Only initiate a full scan if it's ON and explicitly requested
-            if is_enabled and do_scan:
-                self.perform_wifi_scan()
-
-        GLib.idle_add(update_gui)
+        GLib.idle_add(lambda: self._apply_wifi_radio_state(is_enabled, do_scan))
+
+    def _apply_wifi_radio_state(self, is_enabled, do_scan=False):
+        """Main-thread part of refresh_wifi_ui_on_toggle."""
+        if is_enabled:
+            self.wifi_toggle_button.set_label("Wi-Fi: ON")
+            self.wifi_toggle_button.set_css_classes(['wifi-on'])
+            self.wifi_networks_listbox.set_sensitive(True)
+        else:
+            self.wifi_toggle_button.set_label("Wi-Fi: OFF")
+            self.wifi_toggle_button.set_css_classes(['wifi-off'])
+            
+            # Clear and disable listbox when radio is off
+            self._show_wifi_message("Wi-Fi radio is OFF. Toggle ON to scan.")
+            self.wifi_networks_listbox.set_sensitive(False) 
+            
+        # Only initiate a full scan if it's ON and explicitly requested
+        if is_enabled and do_scan:
+            self.perform_wifi_scan()
 
 
     def get_active_wifi_connections(self):
-        """Uses nmcli to find ALL active connections."""
-        stdout, _, _ = self._run_subprocess(
-            ["nmcli", "-t", "-f", "TYPE,DEVICE,NAME,UUID", "connection", "show", "--active"],
-            timeout=5
-        )
-        connections = []
-        for line in stdout.split("\n"):
-            if line:
-                parts = line.split(":")
-                if len(parts) >= 4:
-                    connections.append({
-                        "type": parts[0], 
-                        "device": parts[1], 
-                        "name": parts[2], 
-                        "uuid": parts[3]
-                    })
-        return connections
+        """Finds ALL active connections."""
+        return self.wifi.active_connections()
 
 
     def do_disconnect_wifi(self, connection_name, uuid):
         """Disconnects a specific Wi-Fi connection by its UUID."""
-        stdout, stderr, returncode = self._run_subprocess(
-            ["nmcli", "connection", "down", uuid], timeout=10
-        )
-        if returncode == 0:
+        error = self.wifi.disconnect(uuid)
+        if error is None:
             self._update_status_text(f"✅ Disconnected from {connection_name}")
         else:
-            self._update_status_text(f"❌ Failed to disconnect: {stderr}")
+            self._update_status_text(f"❌ Failed to disconnect: {error}")
         self.refresh_status() 
 
     def do_forget_wifi(self, connection_name, uuid):
@@ -344,14 +1534,12 @@ class ConnectionCentreApp(Gtk.Application):
         # Ensure it's down first, then delete
         self.do_disconnect_wifi(connection_name, uuid)
         
-        stdout, stderr, returncode = self._run_subprocess(
-            ["nmcli", "connection", "delete", uuid], timeout=10
-        )
+        error = self.wifi.forget(uuid)
         
-        if returncode == 0:
+        if error is None:
             self._update_status_text(f"✅ Forgotten network profile: {connection_name}")
         else:
-            self._update_status_text(f"❌ Failed to forget: {stderr}")
+            self._update_status_text(f"❌ Failed to forget: {error}")
         
         self.refresh_status() 
 
@@ -385,99 +1573,198 @@ class ConnectionCentreApp(Gtk.Application):
         listbox.append(row)
 
     def refresh_status(self):
-        """Updates the primary status text and the connected networks listbox."""
-        
-        # 1. Update primary status text (Runs on main thread for quick update)
-        stdout, _, _ = self._run_subprocess(
-            ["nmcli", "-t", "-f", "DEVICE,TYPE,STATE,CONNECTION", "device"], timeout=3
-        )
+        """Queues a status refresh; nothing here blocks the main thread.
+
+        The backend gathers devices, radio state and active connections on a
+        worker (nmcli runs its three queries in parallel), then _apply_status
+        updates whatever changed and schedules the next refresh when polling.
+        """
+        self._safe_thread_start(target=self._refresh_status_thread, panel_name="wifi", cancellable=True)
+        return GLib.SOURCE_REMOVE
+
+    def _poll_status(self):
+        # The timer ends here, so forget its ID before anything tries to remove it
+        self.refresh_jobs.pop('wifi_status', None)
+        return self.refresh_status()
+
+    def _refresh_status_thread(self):
+        devices, is_enabled, active_connections = self.wifi.status()
+
         lines = []
-        for line in stdout.split("\n"):
-            if line:
-                parts = line.split(":")
-                device, dev_type, state, connection = (parts + [""] * 4)[:4]
-                if state.lower() == "connected":
-                    lines.append(f"✅ {device} ({dev_type}) connected to {connection}")
-                elif dev_type in ("wifi", "ethernet"):
-                    lines.append(f"❌ {device} ({dev_type}) not connected (State: {state})")
+        for device, dev_type, state, connection in devices:
+            if state.lower() == "connected":
+                lines.append(f"✅ {device} ({dev_type}) connected to {connection}")
+            elif dev_type in ("wifi", "ethernet"):
+                lines.append(f"❌ {device} ({dev_type}) not connected (State: {state})")
+
+        status = (lines, is_enabled, active_connections)
+        GLib.idle_add(lambda: self._apply_status(status))
+
+    def _apply_status(self, status):
+        """Applies a gathered status on the main thread, touching only what changed."""
+        if self.status_paused:
+            # Speedtest results are on screen; restart_status_refresh resumes
+            return
+        previous = self.wifi_status or (None, None, None)
+        self.wifi_status = status
+        lines, is_enabled, active_connections = status
 
-        self._update_status_text("\n".join(lines) if lines else "No network information available.", clear=True)
-        self.refresh_wifi_ui_on_toggle(do_scan=False) # Update toggle button
+        # 1. Update primary status text
+        if lines != previous[0]:
+            self._update_status_text("\n".join(lines) if lines else "No network information available.", clear=True)
+        if is_enabled != previous[1]:
+            self._apply_wifi_radio_state(is_enabled, do_scan=False) # Update toggle button
 
         # 2. Update the connected networks listbox
-        active_connections = self.get_active_wifi_connections()
-        self.connected_networks_data = active_connections # Store data
+        if active_connections != previous[2]:
+            self.connected_networks_data = active_connections # Store data
+            self._clear_container(self.connected_networks_listbox)
 
-        self._clear_container(self.connected_networks_listbox)
-        
-        if not active_connections:
-            self._add_listbox_item(self.connected_networks_listbox, "No active connections.")
-        else:
-            for conn in active_connections:
-                display = f"{conn['type'].capitalize()}: {conn['name']}"
-                self._add_listbox_item(self.connected_networks_listbox, display, conn)
+            if not active_connections:
+                self._add_listbox_item(self.connected_networks_listbox, "No active connections.")
+            else:
+                for conn in active_connections:
+                    display = f"{conn['type'].capitalize()}: {conn['name']}"
+                    self._add_listbox_item(self.connected_networks_listbox, display, conn)
 
-        # Enable/disable buttons based on if there are ANY active connections
-        has_active_connections = bool(active_connections)
-        self.disconnect_button.set_sensitive(has_active_connections)
-        self.forget_button.set_sensitive(has_active_connections)
-        
-        # 3. Schedule next refresh
-        # Only schedule if the speedtest job hasn't stopped it
+            # Enable/disable buttons based on if there are ANY active connections
+            has_active_connections = bool(active_connections)
+            self.disconnect_button.set_sensitive(has_active_connections)
+            self.forget_button.set_sensitive(has_active_connections)
+
+        # 3. Schedule next refresh, unless NetworkManager pushes changes or the user moved on
         if 'wifi_status' in self.refresh_jobs:
             GLib.source_remove(self.refresh_jobs['wifi_status'])
-        
-        # Schedule the next refresh in 5 seconds
-        self.refresh_jobs['wifi_status'] = GLib.timeout_add_seconds(5, self.refresh_status)
-        return GLib.SOURCE_CONTINUE
+            del self.refresh_jobs['wifi_status']
+        if self.wifi_subscription is None and self.stack.get_visible_child_name() == "wifi":
+            self.refresh_jobs['wifi_status'] = GLib.timeout_add_seconds(5, self._poll_status)
 
 
     def scan_wifi_networks(self):
-        stdout, _, _ = self._run_subprocess(
-            ["nmcli", "-t", "-f", "SSID,SIGNAL", "device", "wifi", "list"], timeout=10
-        )
-        networks = []
-        known_ssids = set()
-        for line in stdout.split("\n"):
-            if line:
-                # Use regex to find the signal percentage at the end
-                match = re.search(r':(\d+)$', line)
-                if match:
-                    signal = match.group(1)
-                    # FIX: Robustly determine the SSID by taking the substring before the signal percentage match
-                    # This prevents SSIDs with colons from breaking the parsing
-                    ssid = line[:match.start()].strip()
-                    
-                    ssid = ssid if ssid else "<Hidden Network>"
-                    
-                    # Only add if we haven't seen this SSID before in this scan
-                    if ssid not in known_ssids:
-                        networks.append((f"{ssid} ({signal}%)", ssid))
-                        known_ssids.add(ssid)
+        """Returns {ssid: (signal, security)}, keeping each SSID's strongest access point."""
+        networks = {}
+        for ssid, signal, security in self.wifi.access_points():
+            ssid = ssid if ssid else "<Hidden Network>"
+            if ssid not in networks or signal > networks[ssid][0]:
+                networks[ssid] = (signal, security)
         return networks
 
-    def perform_wifi_scan(self):
-        """Starts a background thread to scan networks and updates the listbox."""
-        self._clear_container(self.wifi_networks_listbox)
-        self._add_listbox_item(self.wifi_networks_listbox, "Scanning for networks... Please wait.")
+    def _on_wifi_event(self, reason):
+        """NetworkManager signals arrive in bursts; refresh once they settle."""
+        if reason == "profiles":
+            # Rebuilt lazily by the next connect, whichever panel is showing
+            self.wifi.invalidate_profiles()
+        self.wifi_event_reasons.add(reason)
+        if not self.wifi_event_source:
+            self.wifi_event_source = GLib.timeout_add(250, self._handle_wifi_events)
+
+    def _handle_wifi_events(self):
+        reasons = self.wifi_event_reasons
+        self.wifi_event_reasons = set()
+        self.wifi_event_source = 0
+        if self.stack.get_visible_child_name() != "wifi" or self.status_paused:
+            return GLib.SOURCE_REMOVE
+        if "status" in reasons:
+            self.refresh_status()
+        if "access-points" in reasons and self.wifi_networks_listbox.get_sensitive():
+            self._safe_thread_start(target=self._update_wifi_scan_results_thread, panel_name="wifi", cancellable=True)
+        return GLib.SOURCE_REMOVE
+
+    def perform_wifi_scan(self, rescan=True):
+        """Lists the known networks at once, then asks for a rescan whose results stream in."""
+        if not self.wifi_rows:
+            if self.wifi_scan_cache:
+                # Cached results stand in until the scan finishes
+                scanned_at, networks = self.wifi_scan_cache
+                self._update_wifi_scan_results_gui(networks, cache_time=scanned_at)
+            else:
+                self._show_wifi_message("Scanning for networks... Please wait.")
         
-        self._safe_thread_start(target=self._update_wifi_scan_results_thread, panel_name="wifi")
+        self._safe_thread_start(target=self._update_wifi_scan_results_thread, args=(rescan,),
+                                panel_name="wifi", cancellable=True)
 
-    def _update_wifi_scan_results_thread(self):
+    def _update_wifi_scan_results_thread(self, rescan=False):
         """The function that runs in the thread to get scan results."""
+        # Phase 1: whatever NetworkManager already knows, in milliseconds
         networks = self.scan_wifi_networks()
         # Schedule the GUI update back on the main thread
         GLib.idle_add(lambda: self._update_wifi_scan_results_gui(networks))
 
-    def _update_wifi_scan_results_gui(self, networks):
-        """Updates the Listbox on the main GUI thread."""
+        # Phase 2: a fresh scan, unless one was requested recently
+        now = time.monotonic()
+        if not rescan or (self.wifi_last_rescan is not None
+                          and now - self.wifi_last_rescan < self.MIN_RESCAN_INTERVAL):
+            return
+        self.wifi_last_rescan = now
+        error = self.wifi.request_scan()
+        if error:
+            print(f"Wi-Fi rescan failed: {error}")
+        elif self.wifi_subscription is None:
+            # No AccessPointAdded signals to wait for, so re-list a few times instead
+            GLib.idle_add(self._poll_wifi_rescan, 0)
+
+    def _poll_wifi_rescan(self, step):
+        """Re-lists networks at RESCAN_POLL_MS offsets after a rescan request."""
+        source_id = self.refresh_jobs.pop('wifi_rescan', None)
+        if step == 0 and source_id:
+            GLib.source_remove(source_id)  # Restart the sequence
+        if self.stack.get_visible_child_name() != "wifi":
+            return GLib.SOURCE_REMOVE
+        if step:
+            self._safe_thread_start(target=self._update_wifi_scan_results_thread, panel_name="wifi", cancellable=True)
+        if step < len(self.RESCAN_POLL_MS):
+            delay = self.RESCAN_POLL_MS[step] - (self.RESCAN_POLL_MS[step - 1] if step else 0)
+            self.refresh_jobs['wifi_rescan'] = GLib.timeout_add(delay, self._poll_wifi_rescan, step + 1)
+        return GLib.SOURCE_REMOVE
+
+    def _show_wifi_message(self, text):
+        """Replaces the network list with a single message row."""
         self._clear_container(self.wifi_networks_listbox)
+        self.wifi_rows.clear()
+        self._add_listbox_item(self.wifi_networks_listbox, text)
+
+    @staticmethod
+    def _wifi_row_text(ssid, signal, security):
+        return f"{ssid} ({signal}%) {security}".rstrip()
+
+    @staticmethod
+    def _sort_wifi_rows(row1, row2):
+        # Strongest signal first; message rows (no signal) stay on top
+        return getattr(row2, 'signal', 101) - getattr(row1, 'signal', 101)
+
+    def _update_wifi_scan_results_gui(self, networks, cache_time=None):
+        """Applies {ssid: (signal, security)} to the Listbox as a diff, keeping the selection."""
+        if cache_time is None:
+            self.wifi_scan_cache = (time.monotonic(), networks)
         if not networks:
-            self._add_listbox_item(self.wifi_networks_listbox, "No WiFi networks found.")
-        else:
-            for display, ssid in networks:
+            self._show_wifi_message("No WiFi networks found.")
+            return
+        if not self.wifi_rows:
+            # Drop any message row before the first networks go in
+            self._clear_container(self.wifi_networks_listbox)
+
+        # 1. Remove networks that vanished
+        for ssid in [ssid for ssid in self.wifi_rows if ssid not in networks]:
+            self.wifi_networks_listbox.remove(self.wifi_rows.pop(ssid))
+
+        # 2. Add new networks and update changed ones in place
+        for ssid, (signal, security) in networks.items():
+            row = self.wifi_rows.get(ssid)
+            if row is None:
                 # The data stored here is just the raw SSID needed for connection
-                self._add_listbox_item(self.wifi_networks_listbox, display, ssid)
+                row = self.wifi_rows[ssid] = ListItemRow(self._wifi_row_text(ssid, signal, security), ssid)
+                row.signal, row.security = signal, security
+                self.wifi_networks_listbox.append(row)
+            elif (row.signal, row.security) != (signal, security):
+                row.label.set_label(self._wifi_row_text(ssid, signal, security))
+                signal_changed = row.signal != signal
+                row.signal, row.security = signal, security
+                if signal_changed:
+                    row.changed() # Re-sort just this row
+
+        if cache_time is not None:
+            age = int(time.monotonic() - cache_time)
+            self._update_status_text(f"Showing networks from {age}s ago while rescanning...")
 
 
     def do_connect(self):
@@ -488,59 +1775,30 @@ class ConnectionCentreApp(Gtk.Application):
 
         # The raw SSID is stored in the data attribute of the ListItemRow
         ssid = selected_row.data
+        # May be empty for a saved network; the backend asks for one if the SSID is new
         password = self.password_entry.get_text()
 
-        if not password:
-            self._update_status_text(f"⚠️ Enter a password for {ssid}.")
-            return
-
-        self._clear_container(self.wifi_networks_listbox)
-        self._add_listbox_item(self.wifi_networks_listbox, f"Connecting to {ssid}...")
+        self._show_wifi_message(f"Connecting to {ssid}...")
         
         self._safe_thread_start(target=self._connect_thread, args=(ssid, password), panel_name="wifi")
 
     def _connect_thread(self, ssid, password):
         """Performs the connection in a background thread."""
+        error = self.wifi.connect(ssid, password)
         
-        # 1. Find the Wi-Fi interface name
-        iface_stdout, _, _ = self._run_subprocess(
-            ["nmcli", "-t", "-f", "DEVICE,TYPE", "device"], timeout=3
-        )
-        wifi_iface = next((line.split(":")[0] for line in iface_stdout.split("\n") if ":wifi" in line), None)
-        
-        if not wifi_iface:
-            GLib.idle_add(lambda: self._update_wifi_scan_results_gui([])) # Clear list
-            self._update_status_text("❌ No Wi-Fi interface found.")
-            return
-
-        # 2. Try to delete old connection profile with the same name first
-        # FIX: Use the internal wrapper for consistency and timeout control
-        self._run_subprocess(["nmcli", "connection", "delete", ssid], timeout=5)
-        
-        # 3. Create new connection profile and connect
-        create_cmd = ["nmcli", "connection", "add", "type", "wifi", "ifname", wifi_iface,
-                      "con-name", ssid, "ssid", ssid, "wifi-sec.key-mgmt", "wpa-psk", "wifi-sec.psk", password]
-        
-        _, create__stderr, create_returncode = self._run_subprocess(create_cmd, timeout=10)
-
-        if create_returncode != 0:
-            self._update_status_text(f"❌ Failed to create profile: {create__stderr}")
-            GLib.idle_add(self.perform_wifi_scan) # Re-scan
-            return
-            
-        connect_cmd = ["nmcli", "connection", "up", ssid]
-        connect_stdout, connect_stderr, connect_returncode = self._run_subprocess(connect_cmd, timeout=20)
-        
-        # 4. Update UI with results
-        if connect_returncode == 0:
+        # Update UI with results
+        if error is None:
             self._update_status_text(f"✅ Successfully connected to {ssid}", clear=True)
-            # Re-scan to show connection status
-            GLib.idle_add(self.perform_wifi_scan) 
+        elif error == "No Wi-Fi interface found.":
+            GLib.idle_add(lambda: self._update_wifi_scan_results_gui({})) # Clear list
+            self._update_status_text(f"❌ {error}")
+            return
         else:
-            self._update_status_text(f"❌ Failed to connect: {connect_stderr}", clear=True)
-            GLib.idle_add(self.perform_wifi_scan) # Re-scan
+            self._update_status_text(f"❌ {error}", clear=True)
+        # Re-scan to show connection status
+        GLib.idle_add(self.perform_wifi_scan)
             
-        # 5. Refresh general status
+        # Refresh general status
         GLib.idle_add(self.refresh_status)
 
 
@@ -551,7 +1809,8 @@ class ConnectionCentreApp(Gtk.Application):
             return
 
         conn_data = selected_row.data
-        self.do_disconnect_wifi(conn_data["name"], conn_data["uuid"])
+        self._safe_thread_start(target=self.do_disconnect_wifi, args=(conn_data["name"], conn_data["uuid"]),
+                                panel_name="wifi")
         
     def forget_selected_connection(self):
         selected_row = self.connected_networks_listbox.get_selected_row()
@@ -560,12 +1819,14 @@ class ConnectionCentreApp(Gtk.Application):
             return
 
         conn_data = selected_row.data
-        self.do_forget_wifi(conn_data["name"], conn_data["uuid"])
+        self._safe_thread_start(target=self.do_forget_wifi, args=(conn_data["name"], conn_data["uuid"]),
+                                panel_name="wifi")
 
     def run_speedtest_thread(self):
         """Initiates the speedtest in a separate thread to prevent GUI freeze."""
         
         # FIX: CRITICAL - Stop the continuous refresh job before starting the speedtest
+        self.status_paused = True
         if 'wifi_status' in self.refresh_jobs:
             GLib.source_remove(self.refresh_jobs['wifi_status'])
             del self.refresh_jobs['wifi_status']
@@ -607,6 +1868,8 @@ class ConnectionCentreApp(Gtk.Application):
         # FIX: CRITICAL - Schedule the return to normal status refresh after a long delay (60s)
         def restart_status_refresh():
             # Clear the speedtest results
+            self.status_paused = False
+            self.wifi_status = None # Force a full redraw of the status text
             self._update_status_text("\n\n--- Speedtest results expired. Resuming status updates. ---", clear=True)
             # Calling refresh_status() triggers the first status update and re-schedules the recurring job.
             self.refresh_status() 
@@ -918,10 +2181,11 @@ class ConnectionCentreApp(Gtk.Application):
         # 2. Update the connected devices list and scan if powered
         if is_powered:
             # Perform a quick update on connected devices
-            self._safe_thread_start(target=self._update_connected_bt_list_thread, panel_name="bluetooth")
+            self._safe_thread_start(target=self._update_connected_bt_list_thread, panel_name="bluetooth",
+                                    cancellable=True)
             # Initial scan if the list is empty (avoids re-scanning every 5s)
             if not self.bluetooth_listbox_devices:
-                self._safe_thread_start(target=self._scan_devices_thread, panel_name="bluetooth")
+                self._safe_thread_start(target=self._scan_devices_thread, panel_name="bluetooth", cancellable=True)
 
         # 3. Schedule the next refresh
         if 'bluetooth_status' in self.refresh_jobs:
@@ -930,110 +2194,34 @@ class ConnectionCentreApp(Gtk.Application):
         self.refresh_jobs['bluetooth_status'] = GLib.timeout_add_seconds(5, self.refresh_bt_status)    
         return GLib.SOURCE_CONTINUE
 
-    # --- AUDIO Backend Methods (pactl) ---
+    # --- AUDIO Backend Methods (self.audio, see make_audio_backend) ---
     
     def has_pactl(self):
-        return os.path.exists("/usr/bin/pactl") or self._run_subprocess(["which", "pactl"])[2] == 0
-
-    def _run_pactl(self, args):
-        """Safely run pactl command."""
-        if not self.has_pactl():
-            return "", "pactl command not found. Is PulseAudio/PipeWire installed?", 127
-        # Note: We do NOT use safe_thread_start here as this is a sync helper used *inside* other threads.
-        return self._run_subprocess(["pactl"] + args, timeout=3)
-
-    # REVERTED: Now returns a list of dictionaries with volume and mute status
-    def get_output_devices(self):
-        """Gets a list of output device data (sinks)."""
-        stdout, _, returncode = self._run_pactl(["list", "sinks"])
-        if returncode != 0: return []
-        
-        devices = []
-        current_device = {}
-        
-        for line in stdout.splitlines():
-            line = line.strip()
-            if line.startswith("Sink #"):
-                if 'name' in current_device:
-                    devices.append(current_device)
-                current_device = {}
-                
-            elif line.startswith("Name:"):
-                current_device['name'] = line.split(":", 1)[1].strip()
-            
-            elif line.startswith("Volume:"):
-                # Try to find the percentage volume, default to 0
-                match = re.search(r'/\s*(\d+)%', line)
-                current_device['volume'] = int(match.group(1)) if match else 0
-
-            elif line.startswith("Mute:"):
-                current_device['muted'] = line.split(":", 1)[1].strip().lower() == "yes"
-
-        # Handle the last device
-        if 'name' in current_device:
-            devices.append(current_device)
-            
-        return devices # list of dicts: [{'name': '...', 'volume': 0, 'muted': False}, ...]
-
-    # REVERTED: Now returns a list of dictionaries with volume and mute status
-    def get_input_devices(self):
-        """Gets a list of input device data (sources)."""
-        stdout, _, returncode = self._run_pactl(["list", "sources"])
-        if returncode != 0: return []
-        
-        devices = []
-        current_device = {}
-        
-        for line in stdout.splitlines():
-            line = line.strip()
-            if line.startswith("Source #"):
-                if 'name' in current_device:
-                    devices.append(current_device)
-                current_device = {}
-                
-            elif line.startswith("Name:"):
-                current_device['name'] = line.split(":", 1)[1].strip()
-            
-            elif line.startswith("Volume:"):
-                # Try to find the percentage volume, default to 0
-                match = re.search(r'/\s*(\d+)%', line)
-                current_device['volume'] = int(match.group(1)) if match else 0
-
-            elif line.startswith("Mute:"):
-                current_device['muted'] = line.split(":", 1)[1].strip().lower() == "yes"
-
-        # Handle the last device
-        if 'name' in current_device:
-            devices.append(current_device)
-            
-        return devices # list of dicts
+        return self.audio.available()
 
     def get_default_output(self):
-        stdout, _, returncode = self._run_pactl(["get-default-sink"])
-        return stdout if returncode == 0 else None
+        return self.audio.get_default("sink")
 
     def get_default_input(self):
-        stdout, _, returncode = self._run_pactl(["get-default-source"])
-        return stdout if returncode == 0 else None
+        return self.audio.get_default("source")
 
     def set_default_device(self, device_name, is_output=True):
-        command = ["set-default-sink", device_name] if is_output else ["set-default-source", device_name]
-        self._run_pactl(command)
+        self.audio.set_default("sink" if is_output else "source", device_name)
         # Manually refresh the status after setting default
         self._safe_thread_start(target=self._manual_refresh_thread, panel_name="audio")
 
-    # REVERTED: Removed debounce logic, now calls pactl in a thread directly
     def set_volume(self, scale, device_name, is_output):
-        """Sets the device volume in a background thread to prevent GUI freeze."""
+        """Sets the device volume in the background; rapid slider ticks are coalesced."""
         value = int(scale.get_value()) 
-        command = ["set-sink-volume", device_name, f"{value}%"] if is_output else ["set-source-volume", device_name, f"{value}%"]
-        # Run in a thread to prevent UI freeze
-        self._safe_thread_start(target=lambda: self._run_pactl(command), panel_name="audio")
+        kind = "sink" if is_output else "source"
+        self.volume_writer.set(
+            (kind, device_name), value,
+            lambda v: self.audio.set_volume(kind, device_name, v))
 
 
     def toggle_mute(self, button, device_name, is_output, mute=True):
-        command = ["set-sink-mute", device_name, "1" if mute else "0"] if is_output else ["set-source-mute", device_name, "1" if mute else "0"]
-        self._safe_thread_start(target=lambda: self._run_pactl(command), panel_name="audio")
+        kind = "sink" if is_output else "source"
+        self._safe_thread_start(target=lambda: self.audio.set_mute(kind, device_name, mute), panel_name="audio")
     
     # REVERTED: Accepts initial_volume and is_muted parameters, sets initial value
     def _create_device_row(self, frame_box, device_name, is_output=True, initial_volume=0, is_muted=False):
@@ -1056,7 +2244,7 @@ class ConnectionCentreApp(Gtk.Application):
         # Set initial value from pactl data
         slider.set_value(initial_volume)
         
-        slider.connect("value-changed", lambda s: self.set_volume(s, device_name, is_output))
+        slider.volume_handler = slider.connect("value-changed", lambda s: self.set_volume(s, device_name, is_output))
         container.append(slider)
 
         # Mute/Unmute Buttons (Column 2/3)
@@ -1079,49 +2267,9 @@ class ConnectionCentreApp(Gtk.Application):
         self.device_widgets.append((slider, label, device_name, is_output, container, is_muted))
         return container
 
-    # REVERTED: Now returns (name, index, volume)
     def get_app_list(self):
-        """Parses detailed output of pactl list sink-inputs for (name, index, volume)."""
-        stdout, _, returncode = self._run_pactl(["list", "sink-inputs"])
-        if returncode != 0: return []
-        
-        apps = []
-        current_app = {}
-        
-        for line in stdout.splitlines():
-            line = line.strip()
-            if line.startswith("Sink Input #"):
-                # Finalize the previous app
-                if 'index' in current_app:
-                    name = current_app.get('name') or f"App #{current_app['index']}"
-                    volume = current_app.get('volume', 0)
-                    apps.append( (name, current_app['index'], volume) )
-                
-                # Start the new app
-                current_app = {
-                    'index': line.split("#")[1].strip(),
-                    'name': None,
-                    'volume': 0
-                }
-            elif line.startswith("application.name = ") and current_app.get('name') is None:
-                name = line.split("=",1)[1].strip().strip('"')
-                current_app['name'] = name
-                
-            elif line.startswith("application.process.binary = ") and current_app.get('name') is None:
-                name = line.split("=",1)[1].strip().strip('"')
-                current_app['name'] = name.split("/")[-1]
-            
-            elif line.startswith("Volume:"):
-                match = re.search(r'/\s*(\d+)%', line)
-                current_app['volume'] = int(match.group(1)) if match else 0
-                
-        # Handle the last app in the list
-        if 'index' in current_app:
-             name = current_app.get('name') or f"App #{current_app['index']}" 
-             volume = current_app.get('volume', 0)
-             apps.append( (name, current_app['index'], volume) )
-
-        return apps # Returns list of (name, index, volume)
+        """Lists applications playing audio as (name, index, volume)."""
+        return self.audio.list_apps()
 
 
     # REVERTED: Accepts initial_volume parameter, sets initial value
@@ -1146,7 +2294,7 @@ class ConnectionCentreApp(Gtk.Application):
         slider.set_value(initial_volume)
         
         # Slider connects to the simple threaded method
-        slider.connect("value-changed", lambda s: self._set_app_volume_in_thread(s, app_index))
+        slider.volume_handler = slider.connect("value-changed", lambda s: self._set_app_volume_in_thread(s, app_index))
         container.append(slider)
         
         # Mute/Unmute Buttons (Column 2/3)
@@ -1163,107 +2311,139 @@ class ConnectionCentreApp(Gtk.Application):
         self.app_widgets.append((slider, app_name, app_index, container))
         return container
     
-    # REVERTED: Removed debounce logic, now calls pactl in a thread directly
     def _set_app_volume_in_thread(self, scale, app_index):
-        """Sets the app volume in a background thread to prevent GUI freeze."""
+        """Sets the app volume in the background; rapid slider ticks are coalesced."""
         value = int(scale.get_value())
-        command = ["set-sink-input-volume", app_index, f"{value}%"]
-        # Run in a thread to prevent UI freeze
-        self._safe_thread_start(target=lambda: self._run_pactl(command), panel_name="audio")
+        self.volume_writer.set(
+            ("sink-input", app_index), value,
+            lambda v: self.audio.set_volume("sink-input", app_index, v))
 
 
     def _toggle_app_mute(self, app_index, mute=True):
-        action = "1" if mute else "0"
-        command = ["set-sink-input-mute", app_index, action]
-        self._safe_thread_start(target=lambda: self._run_pactl(command), panel_name="audio")
+        self._safe_thread_start(target=lambda: self.audio.set_mute("sink-input", app_index, mute), panel_name="audio")
 
-    def refresh_all_sliders(self):
-        current_default_out = self.get_default_output()
-        current_default_in = self.get_default_input()
-        
-        # Sinks/Sources
-        # The tuple is now (slider, label, name, is_output, container, is_muted)
-        for i, (slider, label, name, is_output, container, is_muted) in enumerate(self.device_widgets):
-            try:
-                command_prefix = "sink" if is_output else "source"
-                # Use pactl get-volume and get-mute separately for simplicity
-                vol_info, _, _ = self._run_pactl([f"get-{command_prefix}-volume", name])
-                mute_info, _, _ = self._run_pactl([f"get-{command_prefix}-mute", name])
-                current_muted = mute_info.strip().lower() == "yes"
-                
-                is_default = (name == current_default_out) if is_output else (name == current_default_in)
-                
-                # Update slider value
-                match = re.search(r'/\s*(\d+)%', vol_info)
-                if match:
-                    percent = int(match.group(1))
-                    
-                    # Only update the slider if the difference is significant or mute status changed
-                    if abs(slider.get_value() - percent) > 5 or current_muted != is_muted:
-                        # CRITICAL: Block signal handler to prevent recursive calls
-                        handler_id = slider.handler_find(self.set_volume)
-                        if handler_id:
-                            slider.handler_block(handler_id)
-                        
-                        slider.set_value(percent)
-
-                        if handler_id:
-                            slider.handler_unblock(handler_id)
-
-                # Update label color for default and muted status
-                if current_muted:
-                    label.set_css_classes(['bold', 'red-text'])
-                elif is_default:
-                    label.set_css_classes(['bold', 'lime-text'])
-                else:
-                    label.set_css_classes(['bold', 'white-text'])
-                    
-                # Store the updated mute status in the list of widgets
-                self.device_widgets[i] = (slider, label, name, is_output, container, current_muted)
+    def _set_slider_quietly(self, slider, percent):
+        """Moves a slider to a server-reported volume without writing it back."""
+        # Ignore small differences so an in-progress drag is not yanked around
+        if abs(slider.get_value() - percent) <= 5:
+            return
+        slider.handler_block(slider.volume_handler)
+        slider.set_value(percent)
+        slider.handler_unblock(slider.volume_handler)
+
+    def _style_device_label(self, label, name, is_output, is_muted):
+        if is_muted:
+            label.set_css_classes(['bold', 'red-text'])
+        elif name == self.audio_defaults.get("sink" if is_output else "source"):
+            label.set_css_classes(['bold', 'lime-text'])
+        else:
+            label.set_css_classes(['bold', 'white-text'])
+
+    def _start_audio_events(self):
+        """Subscribes to server events; replaces the old 1 s / 3 s polling loops."""
+        if self.audio_subscription is None:
+            self.audio_subscription = self.audio.subscribe(self._on_audio_event, self._on_audio_subscription_lost)
+            self.audio_subscribed_at = time.monotonic()
+        if self.audio_subscription is None and 'audio_snapshot' not in self.refresh_jobs:
+            # No event stream: fall back to one cheap snapshot every few seconds
+            self.refresh_jobs['audio_snapshot'] = GLib.timeout_add_seconds(3, self._poll_audio_snapshot)
+
+    def _poll_audio_snapshot(self):
+        self._safe_thread_start(target=self._manual_refresh_thread, panel_name="audio", cancellable=True)
+        return GLib.SOURCE_CONTINUE
 
+    def _stop_audio_events(self):
+        if self.audio_subscription is not None:
+            self.audio_subscription.close()
+            self.audio_subscription = None
+        with self.audio_events_lock:
+            self.audio_events.clear()
+
+    def _on_audio_subscription_lost(self, subscription):
+        """Called from the reader thread when the server drops the event stream."""
+        GLib.idle_add(self._drop_audio_subscription, subscription)
+
+    def _drop_audio_subscription(self, subscription):
+        if subscription is not self.audio_subscription:
+            return GLib.SOURCE_REMOVE  # Already replaced or closed
+        self.audio_subscription = None
+        if time.monotonic() - self.audio_subscribed_at > 30:
+            self.audio_resubscribe_delay = 1
+        else:
+            self.audio_resubscribe_delay = min(self.audio_resubscribe_delay * 2, 30)
+        if self.stack.get_visible_child_name() == "audio" and 'audio_resubscribe' not in self.refresh_jobs:
+            print(f"Audio events lost; resubscribing in {self.audio_resubscribe_delay} s")
+            self.refresh_jobs['audio_resubscribe'] = GLib.timeout_add_seconds(
+                self.audio_resubscribe_delay, self._resubscribe_audio)
+        return GLib.SOURCE_REMOVE
+
+    def _resubscribe_audio(self):
+        self.refresh_jobs.pop('audio_resubscribe', None)
+        self._start_audio_events()
+        # Catch up on whatever changed while there was no stream
+        self._safe_thread_start(target=self._manual_refresh_thread, panel_name="audio", cancellable=True)
+        return GLib.SOURCE_REMOVE
+
+    def _on_audio_event(self, event, facility, index):
+        """Called from the subscription thread; bursts are handled by a single task."""
+        with self.audio_events_lock:
+            first = not self.audio_events
+            self.audio_events.add((event, facility, index))
+        if first:
+            self._safe_thread_start(target=self._handle_audio_events_thread, panel_name="audio")
+
+    def _handle_audio_events_thread(self):
+        """Re-queries only what the pending events name, then updates the GUI."""
+        with self.audio_events_lock:
+            events = self.audio_events
+            self.audio_events = set()
+
+        # Devices appearing or disappearing rebuild the device rows (rare)
+        if any(event != "change" and facility in ("sink", "source") for event, facility, _ in events):
+            self._manual_refresh_thread()
+            return
 
-            except Exception:
-                # Device probably disconnected, will be cleaned up on next full refresh
-                pass
-        
-        # Check app volumes
+        if any(facility == "server" for _, facility, _ in events):
+            defaults = {"sink": self.get_default_output(), "source": self.get_default_input()}
+            GLib.idle_add(lambda: self._apply_audio_defaults(defaults))
+
+        if any(event != "change" and facility == "sink-input" for event, facility, _ in events):
+            self._check_for_new_apps_thread()
+
+        for event, facility, index in events:
+            if event != "change":
+                continue
+            if facility in ("sink", "source"):
+                name = self.audio_device_names.get((facility, index))
+                if name is None:
+                    continue
+                percent = self.audio.get_volume(facility, name)
+                muted = self.audio.get_mute(facility, name)
+                if percent is not None:
+                    GLib.idle_add(lambda n=name, p=percent, m=muted: self._apply_device_state(n, p, m))
+            elif facility == "sink-input":
+                percent = self.audio.get_volume("sink-input", index)
+                if percent is not None:
+                    GLib.idle_add(lambda i=index, p=percent: self._apply_app_volume(i, p))
+
+    def _apply_audio_defaults(self, defaults):
+        self.audio_defaults = defaults
+        for slider, label, name, is_output, container, is_muted in self.device_widgets:
+            self._style_device_label(label, name, is_output, is_muted)
+
+    def _apply_device_state(self, device_name, percent, muted):
+        # The tuple is (slider, label, name, is_output, container, is_muted)
+        for i, (slider, label, name, is_output, container, is_muted) in enumerate(self.device_widgets):
+            if name == device_name:
+                self._set_slider_quietly(slider, percent)
+                self._style_device_label(label, name, is_output, muted)
+                self.device_widgets[i] = (slider, label, name, is_output, container, muted)
+
+    def _apply_app_volume(self, app_index, percent):
         for slider, name, idx, container in self.app_widgets:
-            try:
-                # Use the volume setting command to get current status
-                vol_info, _, _ = self._run_pactl(["get-sink-input-volume", idx])
-                match = re.search(r'/\s*(\d+)%', vol_info)
-                if match:
-                    percent = int(match.group(1))
-                    if abs(slider.get_value() - percent) > 5:
-                        # CRITICAL: Apply signal blocking fix here as well
-                        handler_id = slider.handler_find(self._set_app_volume_in_thread)
-                        if handler_id:
-                            slider.handler_block(handler_id)
-
-                        slider.set_value(percent)
-                        
-                        if handler_id:
-                            slider.handler_unblock(handler_id)
-            except Exception:
-                # App probably closed, will be cleaned up on next full refresh
-                pass
-
-        # 3. Schedule the next volume check in 1 second.
-        if 'audio_devices' in self.refresh_jobs:
-            GLib.source_remove(self.refresh_jobs['audio_devices'])
-        self.refresh_jobs['audio_devices'] = GLib.timeout_add_seconds(1, self.refresh_all_sliders)
-        
-        # 4. Schedule a slower check for new/closed apps
-        if 'audio_apps_scan' not in self.refresh_jobs:
-             self.refresh_jobs['audio_apps_scan'] = GLib.timeout_add_seconds(3, self._check_for_new_apps)
-             
-        return GLib.SOURCE_CONTINUE
-        
-    def _check_for_new_apps(self):
-        """Checks for new/closed apps and updates the list if necessary."""
-        self._safe_thread_start(target=self._check_for_new_apps_thread, panel_name="audio")
-        return GLib.SOURCE_CONTINUE
-        
+            if idx == app_index:
+                self._set_slider_quietly(slider, percent)
+
     def _update_app_list_delta(self, new_apps):
         """
         Updates the app volume list by adding/removing rows to prevent GUI flicker.
@@ -1323,16 +2503,17 @@ class ConnectionCentreApp(Gtk.Application):
             GLib.idle_add(lambda: self.audio_page.append(Gtk.Label(label="PulseAudio control (pactl) not found. Cannot manage audio.", css_classes=['red-text'])))
             return
 
-        # Data collection (slow part)
-        outputs = self.get_output_devices() # list of dicts
-        inputs = self.get_input_devices()   # list of dicts
-        apps = self.get_app_list()          # list of (name, index, volume)
+        # Data collection (slow part): one snapshot of the whole server
+        snapshot = self.audio.snapshot()
         
-        # Schedule GUI updates and start refresh loops on the main thread
-        GLib.idle_add(lambda: self._initial_audio_gui_setup(outputs, inputs, apps))
+        # Schedule GUI updates and the event subscription on the main thread
+        GLib.idle_add(lambda: self._initial_audio_gui_setup(snapshot))
 
-    def _initial_audio_gui_setup(self, outputs, inputs, apps):
-        """Updates the GUI and starts the refresh loops on the main thread."""
+    def _initial_audio_gui_setup(self, snapshot):
+        """Builds the audio widgets from a snapshot and subscribes to audio events on the main thread."""
+        outputs, inputs, apps = snapshot.sinks, snapshot.sources, snapshot.apps
+        self.audio_snapshot = snapshot
+        self.audio_defaults = {"sink": snapshot.default_sink, "source": snapshot.default_source}
         
         # 1. Clear and populate output/input devices (Full rebuild is appropriate here)
         self._clear_container(self.output_device_box)
@@ -1368,20 +2549,52 @@ class ConnectionCentreApp(Gtk.Application):
         # 2. Clear and populate app sliders (Uses delta update now)
         self._update_app_list_delta(apps)
         
-        # 3. Start the continuous refresh loops
-        self.refresh_all_sliders()
+        for slider, label, name, is_output, container, is_muted in self.device_widgets:
+            self._style_device_label(label, name, is_output, is_muted)
+
+        # 3. Remember which server index belongs to each device, for events
+        self.audio_device_names = {("sink", dev.get('index')): dev['name'] for dev in outputs}
+        self.audio_device_names.update({("source", dev.get('index')): dev['name'] for dev in inputs})
+
+        # 4. From here on, the server tells us about changes (unless the user already left)
+        if self.stack.get_visible_child_name() == "audio":
+            self._start_audio_events()
 
 
     def _manual_refresh_thread(self):
-        """Thread target for the manual refresh button."""
-        
-        # 1. Gather all data (SLOW, runs in the background thread)
-        outputs = self.get_output_devices()
-        inputs = self.get_input_devices()
-        apps = self.get_app_list()
-        
-        # 2. Schedule the GUI rebuild (FAST) on the main thread
-        GLib.idle_add(lambda: self._initial_audio_gui_setup(outputs, inputs, apps))
+        """Thread target for the manual refresh button (and device add/remove events)."""
+        
+        # 1. Gather all data in one snapshot (SLOW, runs in the background thread)
+        snapshot = self.audio.snapshot()
+        
+        # 2. Apply only what changed (FAST) on the main thread
+        GLib.idle_add(lambda: self._apply_audio_snapshot(snapshot))
+
+    def _apply_audio_snapshot(self, snapshot):
+        """Diffs snapshot against the one on screen and updates only the changed widgets."""
+        previous = self.audio_snapshot
+        if (previous is None
+                or [d['name'] for d in previous.sinks] != [d['name'] for d in snapshot.sinks]
+                or [d['name'] for d in previous.sources] != [d['name'] for d in snapshot.sources]):
+            # Devices came or went: rebuild the device rows
+            self._initial_audio_gui_setup(snapshot)
+            return
+        self.audio_snapshot = snapshot
+
+        old_devices = {d['name']: d for d in previous.sinks + previous.sources}
+        for dev in snapshot.sinks + snapshot.sources:
+            if old_devices.get(dev['name']) != dev:
+                self._apply_device_state(dev['name'], dev['volume'], dev['muted'])
+
+        if (previous.default_sink, previous.default_source) != (snapshot.default_sink, snapshot.default_source):
+            self._apply_audio_defaults({"sink": snapshot.default_sink, "source": snapshot.default_source})
+
+        if {idx for _, idx, _ in previous.apps} != {idx for _, idx, _ in snapshot.apps}:
+            self._update_app_list_delta(snapshot.apps)
+        old_volumes = {idx: volume for _, idx, volume in previous.apps}
+        for _, idx, volume in snapshot.apps:
+            if idx in old_volumes and old_volumes[idx] != volume:
+                self._apply_app_volume(idx, volume)
 
 
     # --- UI Setup Methods ---
@@ -1404,6 +2617,7 @@ class ConnectionCentreApp(Gtk.Application):
         self.wifi_networks_listbox = Gtk.ListBox()
         self.wifi_networks_listbox.set_css_classes(['network-list'])
         self.wifi_networks_listbox.set_selection_mode(Gtk.SelectionMode.SINGLE)
+        self.wifi_networks_listbox.set_sort_func(self._sort_wifi_rows)
         self.networks_scrolled_window.set_child(self.wifi_networks_listbox)
         self.wifi_page.append(self.networks_scrolled_window)
 
@@ -1498,7 +2712,8 @@ class ConnectionCentreApp(Gtk.Application):
 
         self.wifi_toggle_button = Gtk.Button(label="Wi-Fi: ...")
         self.wifi_toggle_button.set_hexpand(True)
-        self.wifi_toggle_button.connect("clicked", lambda x: self.toggle_wifi_radio()) 
+        self.wifi_toggle_button.connect(
+            "clicked", lambda x: self._safe_thread_start(target=self.toggle_wifi_radio, panel_name="wifi"))
         button_box_bottom.append(self.wifi_toggle_button)
 
         btn_scan = Gtk.Button(label="Scan for Networks")
@@ -1697,7 +2912,8 @@ class ConnectionCentreApp(Gtk.Application):
         # NOTE: The command is adapted to start a thread inside the class instance
         btn_refresh_audio.connect(
             "clicked", 
-            lambda x: self._safe_thread_start(target=self._manual_refresh_thread, panel_name="audio")
+            lambda x: self._safe_thread_start(target=self._manual_refresh_thread, panel_name="audio",
+                                              cancellable=True)
         )
         self.audio_page.append(btn_refresh_audio)
         
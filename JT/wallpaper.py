@@ -1,33 +1,1245 @@
 #!/usr/bin/env python3
+import time
+
+# Taken before the other imports so --profile-startup can include their cost
+STARTUP_MARKS = [("process start", time.perf_counter())]
+
+import argparse
+import collections
+import colorsys
+import fcntl
+import bisect
+import hashlib
+import json
 import os
-import subprocess
+import pathlib
+import queue
+import signal
+import socket
+import sys
 import threading
-import time
-from concurrent.futures import ThreadPoolExecutor
+import weakref
+
+# Commands a daemon accepts over its socket (one line per connection)
+IPC_COMMANDS = ("toggle", "show", "hide", "quit")
+
+
+def runtime_path(name):
+    """Path for a per-user runtime file such as the IPC socket"""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or f"/tmp/wallpaper-picker-{os.getuid()}"
+    return os.path.join(runtime_dir, name)
+
+
+def send_command(command, path=None):
+    """Sends command to a running daemon; returns its reply, or None if none is listening"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        # A stalled daemon must not hang wp.sh; no reply in time counts as none
+        sock.settimeout(2)
+        try:
+            sock.connect(path or runtime_path("wallpaper-picker.sock"))
+            sock.sendall(command.encode() + b"\n")
+            return sock.recv(256).decode().strip()
+        except (FileNotFoundError, ConnectionRefusedError, socket.timeout):
+            return None
+
+
+def acquire_daemon_lock():
+    """Takes the per-user daemon lock; returns the open lock file, or None if another daemon holds it"""
+    path = runtime_path("wallpaper-picker.lock")
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    lock = open(path, "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        return None
+    return lock
+
+
+def relay_command(command):
+    """Client side of --toggle/--show/--hide/--quit; returns the exit status"""
+    reply = send_command(command)
+    if reply is None:
+        print("No wallpaper picker daemon is running", file=sys.stderr)
+        return 1
+    print(reply)
+    return 0 if reply == "ok" else 1
+
+
+# A lone client flag only relays one line, so answer it before paying for GTK
+if __name__ == "__main__" and len(sys.argv) == 2 and sys.argv[1] in [f"--{c}" for c in IPC_COMMANDS]:
+    sys.exit(relay_command(sys.argv[1][2:]))
+
 import gi
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gtk, GdkPixbuf, GLib, Gdk
+from gi.repository import Gtk, GdkPixbuf, GLib, Gdk, Gio
+
+STARTUP_MARKS.append(("imports", time.perf_counter()))
+
+THUMB_WIDTH, THUMB_HEIGHT = 180, 110
+WALLPAPER_EXTS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Content hashes read this many bytes from each end of a file
+HASH_SAMPLE_BYTES = 64 * 1024
+
+# Perceptual hashes at most this many bits apart count as near-duplicates.
+# Must stay below 4 for the banded lookup in collapse_near_duplicates.
+NEAR_DUPLICATE_BITS = 3
+
+# The scanner hands discovered files to the UI in batches of this size
+SCAN_BATCH_SIZE = 64
+
+# --profile-startup flags a first frame slower than this
+STARTUP_BUDGET_MS = 200
+
+# Decoded thumbnails are applied to the grid at most once per frame, and
+# each batch stops after FRAME_BUDGET seconds so scrolling stays smooth
+FRAME_INTERVAL_MS = 16
+FRAME_BUDGET = 0.008
+
+# Wallpaper.index of entries the grid is not showing (filtered out, or
+# waiting for the next view refresh); sorts after every visible slot
+OFF_GRID_INDEX = sys.maxsize
+
+
+class ThumbnailCache:
+    """On-disk thumbnail store using the freedesktop thumbnail layout.
+
+    Files are named after the md5 of the source URI and carry the
+    Thumb::URI / Thumb::MTime / Thumb::Size keys, so a changed source is
+    detected without touching the full-size image. The file mtime doubles
+    as the LRU timestamp for eviction.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=256 * 1024 * 1024):
+        cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        self.cache_dir = cache_dir or os.path.join(cache_home, "thumbnails", "wallpaper-picker")
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, mode=0o700, exist_ok=True)
+
+    def _entry_path(self, uri):
+        return os.path.join(self.cache_dir, hashlib.md5(uri.encode()).hexdigest() + ".png")
+
+    def lookup(self, filepath, st):
+        """Returns the cached pixbuf for filepath, or None if missing/stale"""
+        uri = pathlib.Path(filepath).as_uri()
+        thumb_path = self._entry_path(uri)
+        try:
+            pixbuf = GdkPixbuf.Pixbuf.new_from_file(thumb_path)
+        except GLib.Error:
+            return None
+
+        if (pixbuf.get_option("tEXt::Thumb::URI") != uri
+                or pixbuf.get_option("tEXt::Thumb::MTime") != str(int(st.st_mtime))
+                or pixbuf.get_option("tEXt::Thumb::Size") != str(st.st_size)):
+            # Source changed since the thumbnail was written
+            self._remove(thumb_path)
+            return None
+
+        # Bump the mtime so eviction treats this entry as recently used
+        try:
+            os.utime(thumb_path)
+        except OSError:
+            pass
+        return pixbuf
+
+    def store(self, filepath, st, pixbuf):
+        """Writes pixbuf as the thumbnail for filepath (atomically)"""
+        uri = pathlib.Path(filepath).as_uri()
+        thumb_path = self._entry_path(uri)
+        tmp_path = f"{thumb_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            pixbuf.savev(
+                tmp_path, "png",
+                ["tEXt::Thumb::URI", "tEXt::Thumb::MTime", "tEXt::Thumb::Size"],
+                [uri, str(int(st.st_mtime)), str(st.st_size)],
+            )
+            os.replace(tmp_path, thumb_path)
+        except (GLib.Error, OSError) as e:
+            print(f"Could not cache thumbnail for {filepath}: {e}")
+            self._remove(tmp_path)
+
+    def prune(self):
+        """Evicts least recently used thumbnails until under max_bytes"""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".png"):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+                    total += st.st_size
+        except OSError as e:
+            print(f"Error reading thumbnail cache: {e}")
+            return
+
+        if total <= self.max_bytes:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def mark_startup(label, report=False):
+    """Records a startup milestone; prints it too when report is set"""
+    STARTUP_MARKS.append((label, time.perf_counter()))
+    if report:
+        return report_startup_mark(len(STARTUP_MARKS) - 1)
+
+
+def report_startup_mark(position):
+    """Prints STARTUP_MARKS[position] with its delta and total; returns the total in ms"""
+    label, now = STARTUP_MARKS[position]
+    previous = STARTUP_MARKS[position - 1][1]
+    total_ms = (now - STARTUP_MARKS[0][1]) * 1000
+    print(f"startup: {label:<24} +{(now - previous) * 1000:7.1f} ms  total {total_ms:7.1f} ms")
+    return total_ms
+
+
+def fit_size(width, height, max_width, max_height):
+    """Size of a width x height image scaled to fit the box, keeping aspect"""
+    scale = min(max_width / width, max_height / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def exif_thumbnail(filepath):
+    """Returns the JPEG thumbnail embedded in filepath's EXIF block, or None"""
+    with open(filepath, "rb") as f:
+        if f.read(2) != b"\xff\xd8":
+            return None
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            if marker[1] == 0xFF:
+                # Fill byte; the marker starts one byte later
+                f.seek(-1, os.SEEK_CUR)
+                continue
+            if marker[1] in (0xDA, 0xD9):
+                # Start of scan / end of image: no metadata beyond this point
+                return None
+            length = int.from_bytes(f.read(2), "big")
+            if length < 2:
+                return None
+            if marker[1] == 0xE1:
+                segment = f.read(length - 2)
+                if segment.startswith(b"Exif\0\0"):
+                    return _tiff_thumbnail(segment[6:])
+            else:
+                f.seek(length - 2, os.SEEK_CUR)
+
+
+def _tiff_thumbnail(tiff):
+    """Extracts the JPEGInterchangeFormat blob referenced by IFD1 of an EXIF TIFF block"""
+    order = {b"II": "little", b"MM": "big"}.get(tiff[:2])
+    if order is None or len(tiff) < 8:
+        return None
+
+    def u16(offset):
+        return int.from_bytes(tiff[offset:offset + 2], order)
+
+    def u32(offset):
+        return int.from_bytes(tiff[offset:offset + 4], order)
+
+    ifd0 = u32(4)
+    if ifd0 + 2 > len(tiff):
+        return None
+    next_ifd_offset = ifd0 + 2 + 12 * u16(ifd0)
+    if next_ifd_offset + 4 > len(tiff):
+        return None
+    ifd1 = u32(next_ifd_offset)
+    if not ifd1 or ifd1 + 2 > len(tiff):
+        return None
+
+    start = length = None
+    for i in range(u16(ifd1)):
+        field = ifd1 + 2 + 12 * i
+        if field + 12 > len(tiff):
+            break
+        tag = u16(field)
+        if tag == 0x0201:
+            start = u32(field + 8)
+        elif tag == 0x0202:
+            length = u32(field + 8)
+
+    if not start or not length or start + length > len(tiff):
+        return None
+    data = tiff[start:start + length]
+    return data if data.startswith(b"\xff\xd8") else None
+
+
+_pil_image = None
+
+
+def _load_pil():
+    """Imports Pillow on first use; returns PIL.Image or False when unavailable"""
+    global _pil_image
+    if _pil_image is None:
+        try:
+            from PIL import Image
+            _pil_image = Image
+        except ImportError:
+            # python-pillow is optional; GdkPixbuf handles everything without it
+            _pil_image = False
+    return _pil_image
+
+
+def decode_jpeg_fast(filepath, width, height):
+    """Thumbnail for a JPEG without a full-resolution decode, or None.
+
+    First tries the EXIF thumbnail, accepted only when its aspect ratio
+    matches the image (so no letterboxing) and it is close to the target
+    size. Otherwise, with Pillow installed, uses draft mode so libjpeg
+    decodes at 1/2, 1/4 or 1/8 scale in the DCT domain.
+    """
+    _, image_width, image_height = GdkPixbuf.Pixbuf.get_file_info(filepath)
+    if not image_width or not image_height:
+        return None
+    target_width, target_height = fit_size(image_width, image_height, width, height)
+
+    data = exif_thumbnail(filepath)
+    if data:
+        loader = GdkPixbuf.PixbufLoader.new_with_type("jpeg")
+        loader.write(data)
+        loader.close()
+        thumb = loader.get_pixbuf()
+        same_aspect = abs(thumb.get_width() / thumb.get_height() - image_width / image_height) < 0.02
+        if same_aspect and thumb.get_width() >= target_width * 0.85:
+            return thumb.scale_simple(target_width, target_height, GdkPixbuf.InterpType.BILINEAR)
+
+    Image = _load_pil()
+    if not Image:
+        return None
+    with Image.open(filepath) as image:
+        image.draft("RGB", (target_width, target_height))
+        image = image.convert("RGB").resize((target_width, target_height), Image.BILINEAR)
+    return GdkPixbuf.Pixbuf.new_from_bytes(
+        GLib.Bytes.new(image.tobytes()), GdkPixbuf.Colorspace.RGB, False, 8,
+        target_width, target_height, target_width * 3)
+
+
+def decode_thumbnail(filepath, width=THUMB_WIDTH, height=THUMB_HEIGHT):
+    """Decodes filepath to fit in width x height, taking the JPEG fast path when it applies"""
+    if filepath.lower().endswith((".jpg", ".jpeg")):
+        try:
+            pixbuf = decode_jpeg_fast(filepath, width, height)
+        except Exception as e:
+            print(f"JPEG fast path failed for {filepath}: {e}")
+            pixbuf = None
+        if pixbuf is not None:
+            return pixbuf
+    # Load directly to thumbnail size for speed and low RAM usage
+    return GdkPixbuf.Pixbuf.new_from_file_at_size(filepath, width, height)
+
+
+def _decode_into_block(filepath, block_name, width, height):
+    """Process-pool entry point: decodes filepath as RGBA into a shared memory block"""
+    from multiprocessing import shared_memory
+
+    pixbuf = decode_thumbnail(filepath, width, height)
+    if not pixbuf.get_has_alpha():
+        pixbuf = pixbuf.add_alpha(False, 0, 0, 0)
+    pixels = pixbuf.read_pixel_bytes().get_data()
+
+    block = shared_memory.SharedMemory(name=block_name)
+    try:
+        block.buf[:len(pixels)] = pixels
+    finally:
+        block.close()
+    return pixbuf.get_width(), pixbuf.get_height(), pixbuf.get_rowstride(), len(pixels)
+
+
+class ThreadDecodeBackend:
+    """Decodes thumbnails directly on the scheduler's worker threads"""
+
+    name = "thread"
+
+    def __init__(self, workers=None):
+        self.workers = workers or 4
+
+    def decode(self, filepath):
+        return decode_thumbnail(filepath)
+
+    def shutdown(self, wait=False):
+        pass
+
+
+class ProcessDecodeBackend:
+    """Decodes thumbnails in worker processes, one per CPU by default.
+
+    Each scheduler thread borrows a shared memory block sized for one RGBA
+    thumbnail, so pixel data never goes through the result pipe; only the
+    geometry is pickled back. The parent copies the block out into bytes,
+    and PyGObject copies those once more when it marshals them into the
+    GLib.Bytes the pixbuf owns; the bindings cannot wrap shared memory
+    directly. The pool is only started by the first cache miss, so a fully
+    cached launch never spawns a process. A worker that crashes (say a
+    loader segfaulting on a malformed file) breaks the pool; it is then
+    replaced, and the files caught in it are retried one at a time in a
+    process of their own so only the culprit fails.
+    """
+
+    name = "process"
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 4
+        self.pool = None
+        self.pool_lock = threading.Lock()
+        self.blocks = queue.Queue()
+        self.all_blocks = []  # Every block created, including those out on loan
+
+    @staticmethod
+    def _new_pool(workers):
+        from concurrent.futures import ProcessPoolExecutor
+        import multiprocessing
+
+        # Forking a process that already runs GTK threads is unsafe
+        return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def _start_pool(self):
+        from multiprocessing import shared_memory
+
+        self.pool = self._new_pool(self.workers)
+        for _ in range(self.workers):
+            block = shared_memory.SharedMemory(create=True, size=THUMB_WIDTH * THUMB_HEIGHT * 4)
+            self.all_blocks.append(block)
+            self.blocks.put(block)
+
+    def _replace_pool(self, broken):
+        """Swaps a broken pool for a new one, once however many threads noticed"""
+        with self.pool_lock:
+            if self.pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self.pool = self._new_pool(self.workers)
+
+    def decode(self, filepath):
+        from concurrent.futures.process import BrokenProcessPool
+
+        with self.pool_lock:
+            if self.pool is None:
+                self._start_pool()
+            pool = self.pool
+        block = self.blocks.get()
+        args = (_decode_into_block, filepath, block.name, THUMB_WIDTH, THUMB_HEIGHT)
+        try:
+            try:
+                width, height, rowstride, length = pool.submit(*args).result()
+            except BrokenProcessPool:
+                print(f"Decode worker died with {filepath} in flight; retrying it alone")
+                self._replace_pool(pool)
+                # A file that crashes again only takes down this single-use process
+                with self._new_pool(1) as single:
+                    width, height, rowstride, length = single.submit(*args).result()
+            data = GLib.Bytes.new_take(bytes(block.buf[:length]))
+        finally:
+            self.blocks.put(block)
+        return GdkPixbuf.Pixbuf.new_from_bytes(
+            data, GdkPixbuf.Colorspace.RGB, True, 8, width, height, rowstride)
+
+    def shutdown(self, wait=False):
+        """Stops the pool; wait=True also reaps the worker processes before returning"""
+        with self.pool_lock:
+            if self.pool is None:
+                return
+        self.pool.shutdown(wait=wait, cancel_futures=True)
+        # Unlink blocks still lent to a decode too, or they outlive us in /dev/shm
+        for block in self.all_blocks:
+            try:
+                block.close()
+            except BufferError:
+                pass  # A decode thread is copying out of it; the mapping goes with the process
+            try:
+                block.unlink()
+            except FileNotFoundError:
+                pass
+        self.all_blocks.clear()
+
+
+DECODE_BACKENDS = {
+    ThreadDecodeBackend.name: ThreadDecodeBackend,
+    ProcessDecodeBackend.name: ProcessDecodeBackend,
+}
+
+
+def scan_wallpapers(roots, max_depth=None, on_directory=None):
+    """Yields a DirEntry for every wallpaper below roots, as it is found.
+
+    Directories are walked depth-first with os.scandir, so file type checks
+    come from the dirent and need no extra stat. on_directory(path, depth)
+    is called for each directory before it is read. Symlinked directories
+    are not followed to avoid cycles.
+    """
+    stack = [(root, 0) for root in reversed(roots)]
+    while stack:
+        directory, depth = stack.pop()
+        if on_directory:
+            on_directory(directory, depth)
+
+        subdirs = []
+        try:
+            with os.scandir(directory) as it:
+                for dir_entry in it:
+                    try:
+                        if dir_entry.is_dir(follow_symlinks=False):
+                            if max_depth is None or depth < max_depth:
+                                subdirs.append(dir_entry.path)
+                        elif dir_entry.name.lower().endswith(WALLPAPER_EXTS) and dir_entry.is_file():
+                            yield dir_entry
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"Error reading directory: {e}")
+        stack.extend((path, depth + 1) for path in reversed(subdirs))
+
+
+def content_hash(path, size):
+    """Cheap content fingerprint: the size plus both ends of the file"""
+    digest = hashlib.blake2b(str(size).encode(), digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(HASH_SAMPLE_BYTES))
+        if size > HASH_SAMPLE_BYTES:
+            f.seek(max(HASH_SAMPLE_BYTES, size - HASH_SAMPLE_BYTES))
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def perceptual_hash(pixbuf):
+    """64-bit difference hash: one bit per horizontal brightness step on a 9x8 image"""
+    small = pixbuf.scale_simple(9, 8, GdkPixbuf.InterpType.BILINEAR)
+    pixels = small.get_pixels()
+    channels = small.get_n_channels()
+    rowstride = small.get_rowstride()
+
+    value = 0
+    for y in range(8):
+        previous = None
+        for x in range(9):
+            offset = y * rowstride + x * channels
+            luma = pixels[offset] * 299 + pixels[offset + 1] * 587 + pixels[offset + 2] * 114
+            if previous is not None:
+                value = (value << 1) | (luma > previous)
+            previous = luma
+    return value
+
+
+def dominant_color(pixbuf):
+    """Most common colour of a pixbuf: the mean of its fullest 4x4x4 histogram bin"""
+    small = pixbuf.scale_simple(16, 10, GdkPixbuf.InterpType.BILINEAR)
+    pixels = small.get_pixels()
+    channels = small.get_n_channels()
+    rowstride = small.get_rowstride()
+
+    bins = collections.defaultdict(lambda: [0, 0, 0, 0])
+    for y in range(small.get_height()):
+        for x in range(small.get_width()):
+            offset = y * rowstride + x * channels
+            r, g, b = pixels[offset], pixels[offset + 1], pixels[offset + 2]
+            totals = bins[(r >> 6, g >> 6, b >> 6)]
+            totals[0] += r
+            totals[1] += g
+            totals[2] += b
+            totals[3] += 1
+
+    r, g, b, count = max(bins.values(), key=lambda totals: totals[3])
+    return round(r / count), round(g / count), round(b / count)
+
+
+def fuzzy_match(query, text):
+    """True if every character of query appears in text, in order"""
+    position = 0
+    for char in query:
+        position = text.find(char, position) + 1
+        if not position:
+            return False
+    return True
+
+
+def _hue_key(entry):
+    if entry.color is None:
+        return (1, 0, 0)
+    h, s, v = colorsys.rgb_to_hsv(*(c / 255 for c in entry.color))
+    # Greys have no meaningful hue; keep them together after the colours
+    return (0, h if s > 0.15 else 2 + v, v)
+
+
+# Sort modes offered in the toolbar; None keeps scan order
+SORT_KEYS = {
+    "Scan order": None,
+    "Newest": lambda entry: -(entry.stat.st_mtime if entry.stat else 0),
+    "Name": lambda entry: entry.search_key,
+    "Colour": _hue_key,
+    "Resolution": lambda entry: -((entry.width or 0) * (entry.height or 0)),
+}
+
+
+def collapse_near_duplicates(entries, max_distance=NEAR_DUPLICATE_BITS):
+    """Returns entries without those whose perceptual hash is close to an earlier one.
+
+    The 64-bit hash is split into four 16-bit bands. Two hashes at most 3
+    bits apart must agree on at least one band, so only entries sharing a
+    band are compared instead of every pair.
+    """
+    kept = []
+    buckets = collections.defaultdict(list)
+    for entry in entries:
+        if entry.phash is None:
+            kept.append(entry)
+            continue
+
+        bands = [(band, (entry.phash >> (16 * band)) & 0xFFFF) for band in range(4)]
+        if any(bin(entry.phash ^ other.phash).count("1") <= max_distance
+               for key in bands for other in buckets[key]):
+            continue
+
+        kept.append(entry)
+        for key in bands:
+            buckets[key].append(entry)
+    return kept
+
+
+class LibraryIndex:
+    """Persistent per-file content and perceptual hashes.
+
+    Records are keyed by path and trusted only while mtime and size still
+    match, so later launches rehash just the files that changed. Records
+    not seen during this session are dropped on save.
+    """
+
+    def __init__(self, index_path=None):
+        cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+        self.index_path = index_path or os.path.join(cache_home, "wallpaper-picker", "index.json")
+        self.lock = threading.Lock()
+        self.records = {}
+        self.seen = set()
+        try:
+            with open(self.index_path) as f:
+                self.records = json.load(f).get("files", {})
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                print(f"Ignoring unreadable wallpaper index: {e}")
+
+    def lookup(self, path, st):
+        """Returns the stored record for path, or {} if missing/stale"""
+        with self.lock:
+            self.seen.add(path)
+            record = self.records.get(path)
+            if record and record["mtime"] == int(st.st_mtime) and record["size"] == st.st_size:
+                return record
+            return {}
+
+    def update(self, path, st, **fields):
+        with self.lock:
+            self.seen.add(path)
+            record = self.records.get(path)
+            if not record or record["mtime"] != int(st.st_mtime) or record["size"] != st.st_size:
+                record = self.records[path] = {"mtime": int(st.st_mtime), "size": st.st_size}
+            record.update(fields)
+
+    def save(self):
+        with self.lock:
+            files = {path: record for path, record in self.records.items() if path in self.seen}
+        # The persist thread and on_destroy may save at the same time
+        tmp_path = f"{self.index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_path), mode=0o700, exist_ok=True)
+            with open(tmp_path, "w") as f:
+                json.dump({"version": 1, "files": files}, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Could not save wallpaper index: {e}")
+
+
+class DecodeOnce:
+    """Lets files with identical content share a single decode.
+
+    The first worker to ask for a content hash decodes it; concurrent
+    requests for the same hash wait for that result. Finished pixbufs are
+    only weakly held, so this never keeps a thumbnail alive by itself.
+    """
 
-class WallpaperPicker(Gtk.Window):
     def __init__(self):
+        self._lock = threading.Lock()
+        self._results = weakref.WeakValueDictionary()
+        self._inflight = {}
+
+    def get(self, key, decode):
+        with self._lock:
+            pixbuf = self._results.get(key)
+            if pixbuf is not None:
+                return pixbuf
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                pixbuf = self._results.get(key)
+            # The first decode failed (or was already collected): try ourselves
+            return pixbuf if pixbuf is not None else decode()
+
+        try:
+            pixbuf = decode()
+            with self._lock:
+                self._results[key] = pixbuf
+            return pixbuf
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+
+class ThumbnailLoader:
+    """Produces the thumbnail for one Wallpaper without touching any UI.
+
+    Tries the on-disk cache first, then a decode shared with identical
+    files, then the decode backend, and records hashes in the library
+    index along the way. Safe to call from many worker threads; raises on
+    unreadable files.
+    """
+
+    def __init__(self, backend, thumbnail_cache, library_index):
+        self.backend = backend
+        self.thumbnail_cache = thumbnail_cache
+        self.library_index = library_index
+        self.decode_once = DecodeOnce()
+
+    def load(self, entry):
+        st = entry.stat or os.stat(entry.path)
+        entry.stat = st
+        record = self.library_index.lookup(entry.path, st)
+        entry.content_hash = record.get("hash") or content_hash(entry.path, st.st_size)
+        entry.phash = record.get("phash")
+        entry.width, entry.height = record.get("width"), record.get("height")
+        entry.color = tuple(record["color"]) if record.get("color") else None
+        if entry.width is None:
+            # Reads only the image header
+            _, entry.width, entry.height = GdkPixbuf.Pixbuf.get_file_info(entry.path)
+
+        pixbuf = self.thumbnail_cache.lookup(entry.path, st)
+        if pixbuf is None:
+            # Exact duplicates of a file already decoded reuse its pixbuf
+            pixbuf = self.decode_once.get(entry.content_hash, lambda: self.backend.decode(entry.path))
+            self.thumbnail_cache.store(entry.path, st, pixbuf)
+
+        if entry.phash is None:
+            entry.phash = perceptual_hash(pixbuf)
+        if entry.color is None:
+            entry.color = dominant_color(pixbuf)
+        self.library_index.update(entry.path, st, hash=entry.content_hash, phash=entry.phash,
+                                  width=entry.width, height=entry.height, color=list(entry.color))
+        return pixbuf
+
+
+class PixbufPool:
+    """Keeps decoded thumbnails within a byte budget.
+
+    Every Wallpaper holding a pixbuf is tracked in least-recently-shown
+    order. Once over budget, the oldest entries outside the protected
+    (on-screen) range give up their pixbuf and show a placeholder; they
+    are read back from the thumbnail cache when scrolled into view again.
+    Only touched from the main thread.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.bytes_in_use = 0
+        self._resident = collections.OrderedDict()  # entry -> pixbuf size
+
+    def put(self, entry, pixbuf):
+        self.discard(entry)
+        size = pixbuf.get_byte_length()
+        entry.pixbuf = pixbuf
+        self._resident[entry] = size
+        self.bytes_in_use += size
+
+    def touch(self, entry):
+        if entry in self._resident:
+            self._resident.move_to_end(entry)
+
+    def discard(self, entry):
+        size = self._resident.pop(entry, None)
+        if size is not None:
+            self.bytes_in_use -= size
+            entry.pixbuf = None
+
+    def trim(self, is_protected):
+        """Evicts least recently shown pixbufs for which is_protected(entry) is false"""
+        if self.bytes_in_use <= self.max_bytes:
+            return
+        for entry in list(self._resident):
+            if self.bytes_in_use <= self.max_bytes:
+                break
+            if not is_protected(entry):
+                self.discard(entry)
+
+
+class Prefetcher:
+    """Warms the page cache for full-size images the user is likely to apply.
+
+    Requests are latest-wins: hovering quickly across many tiles only
+    prefetches where the pointer settles. posix_fadvise(WILLNEED) starts
+    kernel readahead without copying anything into Python.
+    """
+
+    def __init__(self, history=64):
+        self._cond = threading.Condition()
+        self._next = None
+        self._done = collections.OrderedDict()  # recently prefetched (path, mtime)
+        self._history = history
+        threading.Thread(target=self._worker, daemon=True).start()
+
+    def request(self, path):
+        with self._cond:
+            self._next = path
+            self._cond.notify()
+
+    def is_warm(self, path):
+        with self._cond:
+            return any(done_path == path for done_path, _ in self._done)
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while self._next is None:
+                    self._cond.wait()
+                path, self._next = self._next, None
+
+            try:
+                fd = os.open(path, os.O_RDONLY)
+                try:
+                    key = (path, os.fstat(fd).st_mtime)
+                    with self._cond:
+                        if key in self._done:
+                            self._done.move_to_end(key)
+                            continue
+                    os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                print(f"Prefetch failed for {path}: {e}")
+                continue
+
+            with self._cond:
+                self._done[key] = True
+                if len(self._done) > self._history:
+                    self._done.popitem(last=False)
+
+
+class Wallpaper:
+    """A single file in the library; pixbuf is None until decoded or after eviction"""
+
+    __slots__ = ("path", "name", "search_key", "stat", "pixbuf", "index", "content_hash", "phash",
+                 "width", "height", "color", "loaded", "requested")
+
+    def __init__(self, path, name, stat=None, pixbuf=None):
+        self.path = path
+        self.name = name
+        self.search_key = name.lower()
+        self.stat = stat  # os.stat_result from the scan, None when unknown/stale
+        self.pixbuf = pixbuf
+        self.index = OFF_GRID_INDEX  # position in the grid, maintained by WallpaperGrid
+        self.content_hash = None
+        self.phash = None
+        self.width = self.height = None
+        self.color = None       # dominant (r, g, b) of the thumbnail
+        self.loaded = False     # decoded successfully at least once
+        self.requested = False  # queued in the DecodeScheduler
+
+
+class DecodeScheduler:
+    """Thread pool that decodes the thumbnails closest to the viewport first.
+
+    Pending entries are kept sorted by grid index. Each worker takes the
+    entry nearest the focus range (the grid rows on screen) when it pops,
+    so moving the focus while scrolling costs nothing however much is
+    queued. Rows ahead of the focus win over rows already scrolled past,
+    and each result is delivered as soon as it finishes instead of in
+    submission order.
+    """
+
+    def __init__(self, decode, on_done, workers=4):
+        self._decode = decode
+        self._on_done = on_done
+        self._cond = threading.Condition()
+        self._pending = {}   # entry.index -> entries waiting for that grid slot
+        self._indices = []   # sorted keys of self._pending
+        self._focus = (0, 0)
+        self._closed = False
+        for _ in range(workers):
+            threading.Thread(target=self._worker, daemon=True).start()
+
+    def submit(self, entries):
+        with self._cond:
+            for entry in entries:
+                if entry.index not in self._pending:
+                    bisect.insort(self._indices, entry.index)
+                self._pending.setdefault(entry.index, []).append(entry)
+            self._cond.notify_all()
+
+    def reindex(self):
+        """Re-keys queued work after the grid re-numbered its entries"""
+        with self._cond:
+            entries = [entry for index in self._indices for entry in self._pending[index]]
+            self._pending = {}
+            for entry in entries:
+                self._pending.setdefault(entry.index, []).append(entry)
+            self._indices = sorted(self._pending)
+
+    def set_focus(self, first, last):
+        """Re-prioritizes queued work around the [first, last) grid range"""
+        with self._cond:
+            self._focus = (first, last)
+
+    def shutdown(self):
+        """Drops queued work and stops the workers after their current job"""
+        with self._cond:
+            self._closed = True
+            self._pending.clear()
+            self._indices.clear()
+            self._cond.notify_all()
+
+    def _pop(self):
+        # Called with the lock held and work queued. Only two candidates can be
+        # nearest: the first index at or after the focus start and the one before it
+        first, last = self._focus
+        pos = bisect.bisect_left(self._indices, first)
+        if pos == len(self._indices):
+            pos -= 1
+        elif pos and max(0, self._indices[pos] - last + 1) > 2 * (first - self._indices[pos - 1]):
+            # Rows the user already scrolled past matter less than those ahead
+            pos -= 1
+        index = self._indices[pos]
+        entries = self._pending[index]
+        entry = entries.pop(0)
+        if not entries:
+            del self._pending[index]
+            del self._indices[pos]
+        return entry
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._indices and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                entry = self._pop()
+
+            try:
+                result = self._decode(entry)
+            except Exception as e:
+                print(f"Error loading thumbnail: {e}")
+                result = None
+            self._on_done(entry, result)
+
+
+class WallpaperTile(Gtk.Button):
+    """Recyclable grid cell showing one Wallpaper"""
+
+    def __init__(self):
+        super().__init__()
+        self.entry = None
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
+        self.image = Gtk.Image()
+        self.image.set_size_request(THUMB_WIDTH, THUMB_HEIGHT)
+        self.label = Gtk.Label()
+
+        box.pack_start(self.image, True, True, 0)
+        box.pack_start(self.label, False, False, 0)
+        self.add(box)
+        self.set_size_request(WallpaperGrid.TILE_WIDTH, WallpaperGrid.TILE_HEIGHT)
+
+    def bind(self, entry):
+        """Points this tile at another entry, reusing the widgets"""
+        self.entry = entry
+        if entry.pixbuf is not None:
+            self.image.set_from_pixbuf(entry.pixbuf)
+        else:
+            # Not decoded yet, or evicted from the PixbufPool
+            self.image.set_from_icon_name("image-x-generic", Gtk.IconSize.DIALOG)
+
+        # Clean up the label: truncate long names
+        name = entry.name
+        self.label.set_text(name if len(name) < 20 else name[:17] + "...")
+
+
+class WallpaperGrid(Gtk.Layout):
+    """Virtualized grid that only realizes tiles near the viewport.
+
+    Every entry gets a fixed-size cell, so the scroll height is known from
+    the entry count alone. Tiles scrolled out of range are hidden and
+    rebound to whatever entry scrolls into view next, which keeps widget
+    count proportional to the window size rather than the library size.
+    """
+
+    TILE_WIDTH = THUMB_WIDTH + 20
+    TILE_HEIGHT = THUMB_HEIGHT + 40
+    SPACING = 6
+    OVERSCAN_ROWS = 2
+
+    def __init__(self, on_activate, on_viewport_changed=None, on_hover=None):
+        super().__init__()
+        self.on_activate = on_activate
+        self.on_viewport_changed = on_viewport_changed
+        self.on_hover = on_hover
+        self.entries = []
+        self.columns = 1
+        self.tiles = {}        # entry index -> bound tile
+        self.spare_tiles = []  # hidden tiles ready for reuse
+        self._relayout_id = 0
+        self._last_width = 0
+        self._vadjustment_handler = None
+        self._vadjustment = None
+
+        self.connect("size-allocate", self._on_size_allocate)
+        self.connect("notify::vadjustment", self._on_vadjustment_changed)
+
+    def _on_vadjustment_changed(self, *args):
+        if self._vadjustment is not None:
+            self._vadjustment.disconnect(self._vadjustment_handler)
+        self._vadjustment = self.get_vadjustment()
+        if self._vadjustment is not None:
+            self._vadjustment_handler = self._vadjustment.connect(
+                "value-changed", lambda adj: self.queue_relayout())
+
+    def _on_size_allocate(self, widget, allocation):
+        if allocation.width != self._last_width:
+            self._last_width = allocation.width
+            self.queue_relayout()
+
+    def set_entries(self, entries):
+        """Replaces what the grid shows; tiles are rebound on the next relayout"""
+        for entry in self.entries:
+            entry.index = OFF_GRID_INDEX
+        self.entries = list(entries)
+        for index, entry in enumerate(self.entries):
+            entry.index = index
+        self.queue_relayout()
+
+    def extend(self, entries):
+        for entry in entries:
+            entry.index = len(self.entries)
+            self.entries.append(entry)
+        self.queue_relayout()
+
+    def remove_entries(self, entries):
+        removed = set(map(id, entries))
+        for entry in entries:
+            entry.index = OFF_GRID_INDEX
+        self.entries = [entry for entry in self.entries if id(entry) not in removed]
+        for index, entry in enumerate(self.entries):
+            entry.index = index
+        self.queue_relayout()
+
+    def update_entry(self, entry):
+        """Rebinds the tile showing entry, if it is currently realized"""
+        tile = self.tiles.get(entry.index)
+        if tile is not None and tile.entry is entry:
+            tile.bind(entry)
+
+    def visible_range(self, overscan_rows=0):
+        """Returns the [first, last) entry indices inside the viewport"""
+        row_height = self.TILE_HEIGHT + self.SPACING
+        adj = self.get_vadjustment()
+        top = adj.get_value() if adj else 0
+        page = (adj.get_page_size() if adj else 0) or self.get_allocated_height()
+
+        first_row = max(0, int(top // row_height) - overscan_rows)
+        last_row = int((top + page) // row_height) + overscan_rows
+        first = first_row * self.columns
+        last = min(len(self.entries), (last_row + 1) * self.columns)
+        return first, max(first, last)
+
+    def queue_relayout(self):
+        # Coalesce scroll/resize/append bursts into one pass per main loop turn
+        if not self._relayout_id:
+            self._relayout_id = GLib.idle_add(self._relayout)
+
+    def _relayout(self):
+        self._relayout_id = 0
+        cell_width = self.TILE_WIDTH + self.SPACING
+        cell_height = self.TILE_HEIGHT + self.SPACING
+
+        width = self.get_allocated_width()
+        self.columns = max(1, (width + self.SPACING) // cell_width)
+        rows = -(-len(self.entries) // self.columns)
+        self.set_size(width, rows * cell_height)
+
+        first, last = self.visible_range(self.OVERSCAN_ROWS)
+        if self.on_viewport_changed:
+            self.on_viewport_changed(first, last)
+
+        # Recycle tiles that left the visible window
+        for index in [i for i in self.tiles if not first <= i < last]:
+            tile = self.tiles.pop(index)
+            tile.hide()
+            self.spare_tiles.append(tile)
+
+        for index in range(first, last):
+            entry = self.entries[index]
+            x = (index % self.columns) * cell_width
+            y = (index // self.columns) * cell_height
+
+            tile = self.tiles.get(index)
+            if tile is None:
+                if self.spare_tiles:
+                    tile = self.spare_tiles.pop()
+                    self.move(tile, x, y)
+                else:
+                    tile = WallpaperTile()
+                    tile.connect("clicked", lambda t: self.on_activate(t, t.entry.path))
+                    if self.on_hover:
+                        tile.connect("enter-notify-event", lambda t, event: self.on_hover(t.entry))
+                        tile.connect("focus-in-event", lambda t, event: self.on_hover(t.entry))
+                    self.put(tile, x, y)
+                self.tiles[index] = tile
+                tile.bind(entry)
+                tile.show_all()
+            else:
+                if tile.entry is not entry:
+                    tile.bind(entry)
+                self.move(tile, x, y)
+        return False
+
+
+class WallpaperPicker(Gtk.Window):
+    def __init__(self, backend="thread", workers=None, daemon=False, visible=True, roots=None, max_depth=None,
+                 pixbuf_budget=64 * 1024 * 1024, profile_startup=False):
         super().__init__(title="Wallpaper Browser")
         self.set_default_size(900, 600)
         self.set_border_width(12)
 
+        self.roots = roots or [os.path.expanduser("~/Wallpapers")]
+        self.max_depth = max_depth
+        self.entries_by_path = {}
+        self.monitors = {}  # directory -> (Gio.FileMonitor, depth)
+        self.ipc_service = None
+        self.ipc_path = None
+        self.profile_startup = profile_startup
+
+        self.thumbnail_cache = ThumbnailCache()
+        self.library_index = LibraryIndex()
+        self.pixbuf_pool = PixbufPool(pixbuf_budget)
+        self.prefetcher = Prefetcher()
+        self.wbg_process = None
+        self.collapse_duplicates = False
+        self.sort_key = None
+        self.query = ""
+        self.sorted_entries = None   # library in sort order, rebuilt when it changes
+        self.last_query = ""
+        self.last_matches = None     # filter result for last_query, in sort order
+        self.view_refresh_id = 0
+        self.backend = DECODE_BACKENDS[backend](workers)
+        self.loader = ThumbnailLoader(self.backend, self.thumbnail_cache, self.library_index)
+        self.scheduler = DecodeScheduler(
+            self.load_thumbnail, self.queue_thumbnail_result, workers=self.backend.workers)
+        self.connect("destroy", self.on_destroy)
+        self.pending_thumbnails = 0
+        self.scan_finished = False
+        self.loading = True
+        self.persist_source = 0  # Debounced index save + cache prune after monitor changes
+
+        # Finished decodes wait here until the next frame-sized flush
+        self.results = collections.deque()
+        self.results_lock = threading.Lock()
+        self.flush_source = 0
+        self.loaded_count = 0
+        self.total_count = 0
+
         # Main Layout Container
+        self.main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        self.add(self.main_box)
+
+        # The Toolbar
+        self.toolbar = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        self.search_entry = Gtk.SearchEntry()
+        self.search_entry.set_placeholder_text("Search wallpapers")
+        self.search_entry.connect("search-changed", self.on_search_changed)
+        self.toolbar.pack_start(self.search_entry, False, False, 0)
+
+        self.sort_combo = Gtk.ComboBoxText()
+        for label in SORT_KEYS:
+            self.sort_combo.append_text(label)
+        self.sort_combo.set_active(0)
+        self.sort_combo.connect("changed", self.on_sort_changed)
+        self.toolbar.pack_start(self.sort_combo, False, False, 0)
+
+        self.collapse_button = Gtk.CheckButton(label="Collapse near-duplicates")
+        self.collapse_button.connect("toggled", self.on_collapse_toggled)
+        self.toolbar.pack_start(self.collapse_button, False, False, 0)
+        self.memory_label = Gtk.Label()
+        self.toolbar.pack_end(self.memory_label, False, False, 0)
+        self.main_box.pack_start(self.toolbar, False, False, 0)
+
         self.overlay = Gtk.Overlay()
-        self.add(self.overlay)
+        self.main_box.pack_start(self.overlay, True, True, 0)
 
         # The Content Layer (Scrollable Grid)
         self.scroll = Gtk.ScrolledWindow()
-        self.flowbox = Gtk.FlowBox()
-        self.flowbox.set_valign(Gtk.Align.START)
-        self.flowbox.set_max_children_per_line(6)
-        self.flowbox.set_selection_mode(Gtk.SelectionMode.NONE)
-        self.scroll.add(self.flowbox)
+        self.scroll.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        self.grid = WallpaperGrid(self.on_click, self.on_viewport_changed, self.on_tile_hover)
+        self.scroll.add(self.grid)
         self.overlay.add(self.scroll)
+        self.loading_box = None  # built by start_scan, after the first frame
+
+        if daemon:
+            # Closing only hides the window; wp.sh brings it back over the socket
+            self.connect("delete-event", self.on_delete)
+            self.listen(runtime_path("wallpaper-picker.sock"))
+
+        # Thumbnails from the last session go on screen before any disk scanning
+        self.add_wallpapers_to_ui(self.indexed_wallpapers())
+        mark_startup("window built", self.profile_startup)
+
+        self.main_box.show_all()
+        if visible:
+            self.first_frame_handler = self.connect_after("draw", self.on_first_frame)
+            self.show()
+        else:
+            self.start_scan()
 
+    def indexed_wallpapers(self):
+        """Placeholders for indexed files under the roots, in their last scan order"""
+        entries = []
+        for path in self.library_index.records:
+            for root in self.roots:
+                relative = os.path.relpath(path, root)
+                if relative.startswith(os.pardir + os.sep):
+                    continue
+                if self.max_depth is None or relative.count(os.sep) <= self.max_depth:
+                    entries.append(Wallpaper(path, os.path.basename(path)))
+                break
+        return entries
+
+    def on_first_frame(self, widget, cr):
+        self.disconnect(self.first_frame_handler)
+        total_ms = mark_startup("first frame", self.profile_startup)
+        if total_ms is not None and total_ms > STARTUP_BUDGET_MS:
+            print(f"startup: first frame missed the {STARTUP_BUDGET_MS} ms budget")
+        GLib.idle_add(self.start_scan)
+        return False
+
+    def start_scan(self):
+        """Shows the progress overlay and starts the background scan"""
         # The Loading Layer (Animated Progress Bar)
         self.loading_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=15)
         self.loading_box.set_valign(Gtk.Align.CENTER)
@@ -51,6 +1263,7 @@ class WallpaperPicker(Gtk.Window):
             css_provider,
             Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION
         )
+        mark_startup("css", self.profile_startup)
         
         self.progress = Gtk.ProgressBar()
         self.progress.set_size_request(300, 20)
@@ -60,99 +1273,550 @@ class WallpaperPicker(Gtk.Window):
         self.loading_box.pack_start(self.label, False, False, 0)
         
         self.overlay.add_overlay(self.loading_box)
-        
-        # Start the "Pulse" animation for the progress bar
-        self.is_loading = True
-        GLib.timeout_add(50, self.animate_loading)
-
-        self.show_all()
+        self.loading_box.show_all()
+        if self.total_count:
+            self.update_progress()
 
         # Start the async background loader
-        threading.Thread(target=self.load_wallpapers_async, daemon=True).start()
-
-    def animate_loading(self):
-        """Makes the progress bar block slide back and forth"""
-        if self.is_loading:
-            self.progress.pulse()
-            return True 
-        return False 
-
-    def load_wallpapers_async(self):
-        """Scans ~/Wallpapers and loads thumbnails efficiently"""
-        wallpaper_dir = os.path.expanduser("~/Wallpapers")
-        valid_exts = (".png", ".jpg", ".jpeg", ".webp")
-        
+        threading.Thread(target=self.load_wallpapers_async, args=(self.roots, 0), daemon=True).start()
+        return False
+
+    def load_wallpapers_async(self, roots, base_depth):
+        """Streams wallpapers under roots to the UI as placeholder batches"""
+        max_depth = None if self.max_depth is None else self.max_depth - base_depth
+        if max_depth is not None and max_depth < 0:
+            return
+
+        def on_directory(path, depth):
+            # Watch before reading so nothing created mid-scan is missed: the monitor
+            # must exist before scandir runs, so it is created on this thread
+            monitor = self.watch_directory(path, base_depth + depth)
+            if monitor is not None:
+                GLib.idle_add(self.register_monitor, path, monitor, base_depth + depth)
+
+        batch = []
+        for dir_entry in scan_wallpapers(roots, max_depth, on_directory):
+            try:
+                st = dir_entry.stat()
+            except OSError:
+                continue
+            batch.append(Wallpaper(dir_entry.path, dir_entry.name, st))
+            if len(batch) >= SCAN_BATCH_SIZE:
+                GLib.idle_add(self.add_wallpapers_to_ui, batch)
+                batch = []
+
+        if batch:
+            GLib.idle_add(self.add_wallpapers_to_ui, batch)
+        if base_depth == 0:
+            GLib.idle_add(self.on_scan_finished)
+
+    def watch_directory(self, path, depth):
+        """Starts an inotify monitor for one scanned directory; called from scan threads.
+
+        Created on a thread with no main context of its own, the monitor
+        delivers its signals to the default one, so the handler runs on the
+        main loop. The handler is bound to the depth, so events that arrive
+        before register_monitor runs are still handled.
+        """
+        if path in self.monitors:
+            return None
         try:
-            files = [f for f in os.listdir(wallpaper_dir) if f.lower().endswith(valid_exts)]
-        except Exception as e:
-            print(f"Error reading directory: {e}")
-            files = []
-        
-        # Load thumbnails in parallel using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            futures = []
-            for filename in files:
-                filepath = os.path.join(wallpaper_dir, filename)
-                future = executor.submit(self.load_thumbnail, filepath, filename)
-                futures.append(future)
-            
-            # Process results as they complete
-            for future in futures:
-                try:
-                    result = future.result()
-                    if result:
-                        filepath, filename, pixbuf = result
-                        GLib.idle_add(self.add_wallpaper_to_ui, filepath, filename, pixbuf)
-                except Exception as e:
-                    print(f"Error loading thumbnail: {e}")
-
-        # Hide loading overlay when done
-        GLib.idle_add(self.stop_loading)
-
-    def load_thumbnail(self, filepath, filename):
-        """Load a single thumbnail efficiently"""
-        try:
-            # Load directly to thumbnail size for speed and low RAM usage
-            pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_size(filepath, 180, 110)
-            return filepath, filename, pixbuf
+            monitor = Gio.File.new_for_path(path).monitor_directory(
+                Gio.FileMonitorFlags.WATCH_MOVES, None)
+        except GLib.Error as e:
+            print(f"Cannot watch {path}: {e}")
+            return None
+        monitor.connect("changed", self.on_directory_changed, depth)
+        return monitor
+
+    def register_monitor(self, path, monitor, depth):
+        """Main-loop half of watch_directory"""
+        if path in self.monitors:
+            monitor.cancel()  # Two scans raced for the same directory
+        else:
+            self.monitors[path] = (monitor, depth)
+        return False
+
+    def on_directory_changed(self, monitor, file, other_file, event_type, depth):
+        Event = Gio.FileMonitorEvent
+        if not self.loading:
+            self.schedule_persist()
+        if event_type in (Event.DELETED, Event.MOVED_OUT):
+            self.remove_path(file.get_path())
+        elif event_type in (Event.CHANGES_DONE_HINT, Event.MOVED_IN):
+            # CREATED fires before the data is written; wait for the hint
+            self.add_or_refresh_path(file.get_path(), depth)
+        elif event_type == Event.RENAMED:
+            self.remove_path(file.get_path())
+            self.add_or_refresh_path(other_file.get_path(), depth)
+
+    def add_or_refresh_path(self, path, parent_depth):
+        if os.path.isdir(path):
+            if path not in self.monitors:
+                threading.Thread(target=self.load_wallpapers_async,
+                                 args=([path], parent_depth + 1), daemon=True).start()
+            return
+
+        name = os.path.basename(path)
+        if not name.lower().endswith(WALLPAPER_EXTS):
+            return
+        entry = self.entries_by_path.get(path)
+        if entry is None:
+            self.add_wallpapers_to_ui([Wallpaper(path, name)])
+        else:
+            # Rewritten in place: the cache sees the new mtime and re-decodes
+            entry.stat = None
+            self.request_thumbnails([entry])
+
+    def remove_path(self, path):
+        """Drops the tile for path, or every tile below it if it was a directory"""
+        removed = []
+        entry = self.entries_by_path.pop(path, None)
+        if entry is not None:
+            removed.append(entry)
+
+        prefix = path + os.sep
+        for directory in [d for d in self.monitors if d == path or d.startswith(prefix)]:
+            self.monitors.pop(directory)[0].cancel()
+            for entry_path in [p for p in self.entries_by_path if p.startswith(prefix)]:
+                removed.append(self.entries_by_path.pop(entry_path))
+
+        if not removed:
+            return
+        self.invalidate_view()
+        self.grid.remove_entries(removed)
+        self.scheduler.reindex()
+        self.total_count -= len(removed)
+        self.loaded_count -= sum(1 for entry in removed if entry.loaded)
+        for entry in removed:
+            self.pixbuf_pool.discard(entry)
+        self.update_progress()
+
+    def load_thumbnail(self, entry):
+        """Load a single thumbnail from the disk cache, a duplicate, or the decoder"""
+        try:
+            return self.loader.load(entry)
         except Exception as e:
-            print(f"Skipping {filename}: {e}")
+            print(f"Skipping {entry.name}: {e}")
             return None
 
-    def add_wallpaper_to_ui(self, filepath, filename, pixbuf):
-        """Creates the visual button for each image"""
-        button = Gtk.Button()
-        button.connect("clicked", self.on_click, filepath)
-        
-        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=5)
-        image = Gtk.Image.new_from_pixbuf(pixbuf)
-        
-        # Clean up the label: truncate long names
-        display_name = filename if len(filename) < 20 else filename[:17] + "..."
-        label = Gtk.Label(label=display_name)
-        
-        box.pack_start(image, True, True, 0)
-        box.pack_start(label, False, False, 0)
-        
-        button.add(box)
-        self.flowbox.add(button)
-        button.show_all()
+    def add_wallpapers_to_ui(self, entries):
+        """Adds placeholder tiles and queues their thumbnails, nearest the viewport first"""
+        # The directory monitor may already have reported some of these
+        entries = [entry for entry in entries if entry.path not in self.entries_by_path]
+        for entry in entries:
+            self.entries_by_path[entry.path] = entry
+
+        self.invalidate_view()
+        if self.view_is_scan_order():
+            self.grid.extend(entries)
+        else:
+            self.queue_view_refresh()
+        self.scheduler.set_focus(*self.grid.visible_range(WallpaperGrid.OVERSCAN_ROWS))
+        self.request_thumbnails(entries)
+        self.total_count += len(entries)
+        self.update_progress()
+        return False
+
+    def on_scan_finished(self):
+        mark_startup("scan finished", self.profile_startup)
+        self.scan_finished = True
+        if not self.pending_thumbnails:
+            self.finish_loading()
+        return False
+
+    def request_thumbnails(self, entries):
+        for entry in entries:
+            entry.requested = True
+        self.pending_thumbnails += len(entries)
+        self.scheduler.submit(entries)
+
+    def queue_thumbnail_result(self, entry, pixbuf):
+        """Called from decode workers; schedules at most one flush per frame"""
+        with self.results_lock:
+            self.results.append((entry, pixbuf))
+            if not self.flush_source:
+                self.flush_source = GLib.timeout_add(FRAME_INTERVAL_MS, self.flush_thumbnail_results)
+
+    def flush_thumbnail_results(self):
+        """Applies queued thumbnails to the grid within one frame's time budget"""
+        deadline = time.monotonic() + FRAME_BUDGET
+        failed = []
+        while time.monotonic() < deadline:
+            try:
+                entry, pixbuf = self.results.popleft()
+            except IndexError:
+                break
+            self.pending_thumbnails -= 1
+            entry.requested = False
+            if self.entries_by_path.get(entry.path) is not entry:
+                # Deleted while it was being decoded
+                continue
+            if pixbuf is None:
+                # Unreadable file, drop its placeholder
+                del self.entries_by_path[entry.path]
+                failed.append(entry)
+                self.total_count -= 1
+                if entry.loaded:
+                    self.loaded_count -= 1
+                self.pixbuf_pool.discard(entry)
+            else:
+                if not entry.loaded:
+                    entry.loaded = True
+                    self.loaded_count += 1
+                self.pixbuf_pool.put(entry, pixbuf)
+                self.grid.update_entry(entry)
+
+        if failed:
+            self.invalidate_view()
+            self.grid.remove_entries(failed)
+            self.scheduler.reindex()
+        self.trim_pixbufs()
+        if self.collapse_duplicates or self.sort_key in (SORT_KEYS["Colour"], SORT_KEYS["Resolution"]):
+            # New hashes/colours/sizes may hide, reveal or move tiles
+            self.invalidate_view()
+            self.queue_view_refresh()
+        self.update_progress()
+        if not self.loading:
+            # Decodes after the initial load come from the monitors
+            self.schedule_persist()
+        elif self.scan_finished and not self.pending_thumbnails:
+            self.finish_loading()
+
+        with self.results_lock:
+            if self.results:
+                return True
+            self.flush_source = 0
+            return False
+
+    def update_progress(self):
+        if self.loading_box is None:
+            return
+        if self.total_count:
+            self.progress.set_fraction(self.loaded_count / self.total_count)
+        self.label.set_text(f"Loading thumbnails {self.loaded_count}/{self.total_count}")
+
+    def on_viewport_changed(self, first, last):
+        self.scheduler.set_focus(first, last)
+
+        # Bring evicted thumbnails back for whatever is now on screen
+        evicted = []
+        for entry in self.grid.entries[first:last]:
+            self.pixbuf_pool.touch(entry)
+            if entry.pixbuf is None and entry.loaded and not entry.requested:
+                evicted.append(entry)
+        if evicted:
+            self.request_thumbnails(evicted)
+        self.trim_pixbufs()
+
+    def trim_pixbufs(self):
+        first, last = self.grid.visible_range(WallpaperGrid.OVERSCAN_ROWS)
+        entries = self.grid.entries
+        self.pixbuf_pool.trim(
+            lambda entry: first <= entry.index < last and entries[entry.index] is entry)
+        self.memory_label.set_text(f"Thumbnails: {self.pixbuf_bytes_in_use / 2**20:.1f} MiB")
+
+    @property
+    def pixbuf_bytes_in_use(self):
+        """Bytes of decoded thumbnail pixels currently held in memory"""
+        return self.pixbuf_pool.bytes_in_use
+
+    def on_collapse_toggled(self, button):
+        self.collapse_duplicates = button.get_active()
+        self.refresh_view()
+
+    def on_search_changed(self, entry):
+        self.query = entry.get_text().strip().lower()
+        self.refresh_view()
+
+    def on_sort_changed(self, combo):
+        self.sort_key = SORT_KEYS[combo.get_active_text()]
+        self.invalidate_view()
+        self.refresh_view()
+
+    def view_is_scan_order(self):
+        return self.sort_key is None and not self.query and not self.collapse_duplicates
+
+    def invalidate_view(self):
+        """Forgets cached sort/filter results after the library changed"""
+        self.sorted_entries = None
+        self.last_matches = None
+
+    def queue_view_refresh(self):
+        # Sorting/collapsing walks the whole library, so run it at most twice a second
+        if not self.view_refresh_id:
+            self.view_refresh_id = GLib.timeout_add(500, self._refresh_view_timeout)
+
+    def _refresh_view_timeout(self):
+        self.view_refresh_id = 0
+        self.refresh_view()
+        return False
+
+    def refresh_view(self):
+        """Re-orders and filters the existing tiles; nothing is decoded again.
+
+        The sorted library is cached, and when a query only extends the
+        previous one, only the previous matches are re-checked, so typing
+        costs O(matches) rather than O(library).
+        """
+        if self.view_refresh_id:
+            GLib.source_remove(self.view_refresh_id)
+            self.view_refresh_id = 0
+
+        if self.sorted_entries is None:
+            self.sorted_entries = list(self.entries_by_path.values())
+            if self.sort_key is not None:
+                self.sorted_entries.sort(key=self.sort_key)
+
+        if not self.query:
+            entries = self.sorted_entries
+            self.last_matches = None
+        else:
+            if self.last_matches is not None and self.query.startswith(self.last_query):
+                candidates = self.last_matches
+            else:
+                candidates = self.sorted_entries
+            entries = [entry for entry in candidates if fuzzy_match(self.query, entry.search_key)]
+            self.last_matches = entries
+        self.last_query = self.query
+
+        if self.collapse_duplicates:
+            entries = collapse_near_duplicates(entries)
+        self.grid.set_entries(entries)
+        # Queued thumbnails were keyed by their old positions
+        self.scheduler.reindex()
+
+    def finish_loading(self):
+        if not self.loading:
+            return
+        self.loading = False
+        self.stop_loading()
+        self.persist_library()
+
+    def schedule_persist(self):
+        """Saves the index and prunes the cache once changes settle for 10 s.
+
+        A resident picker keeps growing both as the monitors add files, and
+        a session killed at logout never reaches on_destroy.
+        """
+        if self.persist_source:
+            GLib.source_remove(self.persist_source)
+        self.persist_source = GLib.timeout_add_seconds(10, self.persist_library)
+
+    def persist_library(self):
+        self.persist_source = 0
+
+        def persist():
+            self.library_index.save()
+            # Keep the on-disk cache within its size cap
+            self.thumbnail_cache.prune()
+        threading.Thread(target=persist, daemon=True).start()
         return False
 
+    def on_delete(self, widget, event):
+        self.hide()
+        return True
+
+    def toggle_visibility(self):
+        if self.get_visible():
+            self.hide()
+        else:
+            self.present()
+        return GLib.SOURCE_CONTINUE
+
+    def listen(self, path):
+        """Accepts IPC_COMMANDS on a Unix socket, served from the main loop"""
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        try:
+            # Only the holder of the daemon lock gets here, so any socket file is stale
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+        self.ipc_service = Gio.SocketService()
+        self.ipc_service.add_address(
+            Gio.UnixSocketAddress.new(path), Gio.SocketType.STREAM, Gio.SocketProtocol.DEFAULT, None)
+        self.ipc_service.connect("incoming", self.on_ipc_incoming)
+        self.ipc_service.start()
+        self.ipc_path = path
+
+    def on_ipc_incoming(self, service, connection, source_object):
+        # Read asynchronously so a client that connects and sends nothing cannot block the
+        # main loop; give up on it after two seconds
+        stream = Gio.DataInputStream.new(connection.get_input_stream())
+        cancellable = Gio.Cancellable()
+        timeout_id = GLib.timeout_add_seconds(2, lambda: cancellable.cancel() or False)
+        stream.read_line_async(GLib.PRIORITY_DEFAULT, cancellable, self.on_ipc_line,
+                               (connection, cancellable, timeout_id))
+        return True
+
+    def on_ipc_line(self, stream, result, data):
+        connection, cancellable, timeout_id = data
+        if not cancellable.is_cancelled():
+            GLib.source_remove(timeout_id)
+        try:
+            line, _ = stream.read_line_finish_utf8(result)
+        except GLib.Error:
+            connection.close(None)
+            return
+        command = (line or "").strip()
+
+        reply = "ok"
+        if command == "ping":
+            pass
+        elif command == "toggle":
+            self.toggle_visibility()
+        elif command == "show":
+            self.present()
+        elif command == "hide":
+            self.hide()
+        elif command == "quit":
+            GLib.idle_add(self.destroy)
+        else:
+            reply = f"unknown command: {command}"
+
+        connection.get_output_stream().write_all((reply + "\n").encode(), None)
+        connection.close(None)
+
+    def on_destroy(self, widget):
+        if self.ipc_service is not None:
+            self.ipc_service.stop()
+            try:
+                os.remove(self.ipc_path)
+            except OSError:
+                pass
+        if self.persist_source:
+            GLib.source_remove(self.persist_source)
+            self.persist_source = 0
+        self.scheduler.shutdown()
+        self.backend.shutdown()
+        self.library_index.save()
+
     def stop_loading(self):
         """Removes the loading bar from view"""
-        self.is_loading = False
-        self.loading_box.hide()
+        if self.loading_box is not None:
+            self.loading_box.hide()
+        return False
+
+    def on_tile_hover(self, entry):
+        """Starts reading the full-size file before it is clicked"""
+        self.prefetcher.request(entry.path)
         return False
 
     def on_click(self, button, filepath):
-        """The command sequence you requested"""
-        # pkill wbg & nohup wbg -s $wallpaper
-        cmd = f"pkill wbg; nohup wbg -s '{filepath}' > /dev/null 2>&1 &"
-        subprocess.Popen(cmd, shell=True)
-        print(f"Applied wallpaper: {filepath}")
+        """Runs wbg on the clicked wallpaper, replacing the previous instance"""
+        import subprocess
+
+        started = time.perf_counter()
+        warm = self.prefetcher.is_warm(filepath)
+
+        # Start the new wbg before stopping the old one so the desktop never flashes empty
+        previous = self.wbg_process
+        previous_pid = previous.pid if previous else self.read_wbg_pid()
+        try:
+            self.wbg_process = subprocess.Popen(
+                ["wbg", "-s", filepath],
+                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                start_new_session=True,
+            )
+        except OSError as e:
+            print(f"Could not start wbg: {e}")
+            return
+        self.write_wbg_pid(self.wbg_process.pid)
+
+        if previous is not None:
+            previous.terminate()
+        elif previous_pid and self.is_wbg(previous_pid):
+            # Started by an earlier session
+            os.kill(previous_pid, signal.SIGTERM)
+        else:
+            # No live wbg recorded: one from the compositor's autostart would otherwise stay underneath
+            self.stop_other_wbg(self.wbg_process.pid)
+
+        elapsed = (time.perf_counter() - started) * 1000
+        # Only Popen is timed; wbg draws the wallpaper some time after this
+        print(f"Applied wallpaper: {filepath} (wbg launched in {elapsed:.1f} ms, drawing not included, "
+              f"prefetched: {'yes' if warm else 'no'})")
+
+    @staticmethod
+    def is_wbg(pid):
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                return f.read().strip() == "wbg"
+        except OSError:
+            return False
+
+    def stop_other_wbg(self, keep_pid):
+        """Sends SIGTERM to every running wbg except keep_pid"""
+        for name in os.listdir("/proc"):
+            if name.isdigit() and int(name) != keep_pid and self.is_wbg(name):
+                try:
+                    os.kill(int(name), signal.SIGTERM)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def wbg_pid_path():
+        return runtime_path("wallpaper-picker-wbg.pid")
+
+    def read_wbg_pid(self):
+        try:
+            with open(self.wbg_pid_path()) as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def write_wbg_pid(self, pid):
+        try:
+            os.makedirs(os.path.dirname(self.wbg_pid_path()), mode=0o700, exist_ok=True)
+            with open(self.wbg_pid_path(), "w") as f:
+                f.write(str(pid))
+        except OSError as e:
+            print(f"Could not record wbg pid: {e}")
 
 if __name__ == "__main__":
-    win = WallpaperPicker()
+    parser = argparse.ArgumentParser(description="Browse ~/Wallpapers and apply one with wbg")
+    parser.add_argument("--backend", choices=sorted(DECODE_BACKENDS), default="thread",
+                        help="where thumbnails are decoded (default: thread)")
+    parser.add_argument("--workers", type=int,
+                        help="decode workers (default: 4 threads, or one process per CPU)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="stay resident and accept commands on a socket; "
+                             "starts hidden unless combined with --show")
+    for command in IPC_COMMANDS:
+        parser.add_argument(f"--{command}", dest="command", action="store_const", const=command,
+                            help=f"send '{command}' to the running daemon and exit")
+    parser.add_argument("--dir", action="append", dest="roots", metavar="DIR",
+                        help="wallpaper directory to scan recursively; repeatable (default: ~/Wallpapers)")
+    parser.add_argument("--max-depth", type=int,
+                        help="how many directory levels below each --dir to descend (default: unlimited)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import, window, CSS, first-frame and scan timings")
+    parser.add_argument("--pixbuf-budget", type=int, default=64, metavar="MIB",
+                        help="memory for decoded thumbnails before off-screen ones are dropped (default: 64)")
+    args = parser.parse_args()
+
+    if args.command and not args.daemon:
+        sys.exit(relay_command(args.command))
+
+    if args.daemon:
+        # Held until exit; a second daemon started meanwhile (key repeat in wp.sh) backs off
+        # here instead of replacing the first one's socket
+        daemon_lock = acquire_daemon_lock()
+        if daemon_lock is None:
+            send_command(args.command or "ping")
+            print("A wallpaper picker daemon is already running", file=sys.stderr)
+            sys.exit(0)
+
+    if args.profile_startup:
+        # Recorded before argparse existed; everything up to here is import cost
+        report_startup_mark([label for label, _ in STARTUP_MARKS].index("imports"))
+
+    roots = [os.path.abspath(os.path.expanduser(d)) for d in args.roots] if args.roots else None
+    win = WallpaperPicker(backend=args.backend, workers=args.workers,
+                          daemon=args.daemon, visible=not args.daemon or args.command == "show",
+                          roots=roots, max_depth=args.max_depth,
+                          pixbuf_budget=args.pixbuf_budget * 1024 * 1024,
+                          profile_startup=args.profile_startup)
     win.connect("destroy", Gtk.main_quit)
     Gtk.main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""Headless benchmark for the wallpaper.py thumbnail pipeline.
+
+Generates synthetic wallpaper directories, then runs the same scan +
+decode pipeline the picker uses (scan_wallpapers -> DecodeScheduler ->
+ThumbnailLoader) without opening a window. Every configuration runs in
+its own subprocess so peak RSS is per run, first with an empty thumbnail
+cache and then again with the cache it produced. Results are printed (or
+written with --output) as JSON.
+
+    python3 wallpaper_bench.py --counts 100,1000 --backends thread,process
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import wallpaper
+from wallpaper import GdkPixbuf, GLib
+
+SAVE_TYPES = {"png": ("png", ".png"), "jpeg": ("jpeg", ".jpg"), "webp": ("webp", ".webp")}
+
+
+def generate_dataset(root, fmt, width, height, count):
+    """Fills root/<fmt>-<w>x<h>-<count> with count distinct images; reuses existing files"""
+    save_type, ext = SAVE_TYPES[fmt]
+    directory = os.path.join(root, f"{fmt}-{width}x{height}-{count}")
+    os.makedirs(directory, exist_ok=True)
+
+    rng = random.Random(f"{fmt}-{width}x{height}")
+    for i in range(count):
+        path = os.path.join(directory, f"wallpaper-{i:05d}{ext}")
+        if os.path.exists(path):
+            continue
+        # Upscaled random noise gives smooth, photo-like gradients that
+        # compress and decode more like real wallpapers than a flat fill
+        seed = GdkPixbuf.Pixbuf.new_from_bytes(
+            GLib.Bytes.new(rng.randbytes(16 * 16 * 3)), GdkPixbuf.Colorspace.RGB, False, 8, 16, 16, 16 * 3)
+        image = seed.scale_simple(width, height, GdkPixbuf.InterpType.BILINEAR)
+        try:
+            image.savev(path, save_type, [], [])
+        except GLib.Error as e:
+            shutil.rmtree(directory, ignore_errors=True)
+            raise RuntimeError(f"cannot write {fmt} images: {e}") from e
+    return directory
+
+
+def run_pipeline(directory, backend_name, workers, cache_dir):
+    """Scans and decodes directory once; returns timings for this process"""
+    backend = wallpaper.DECODE_BACKENDS[backend_name](workers)
+    loader = wallpaper.ThumbnailLoader(
+        backend,
+        wallpaper.ThumbnailCache(cache_dir=os.path.join(cache_dir, "thumbnails")),
+        wallpaper.LibraryIndex(index_path=os.path.join(cache_dir, "index.json")),
+    )
+
+    lock = threading.Lock()
+    done = threading.Event()
+    state = {"first": None, "finished": 0, "failed": 0, "total": None}
+
+    def load(entry):
+        try:
+            return loader.load(entry)
+        except Exception:
+            return None
+
+    def on_done(entry, pixbuf):
+        with lock:
+            if state["first"] is None and pixbuf is not None:
+                state["first"] = time.perf_counter()
+            state["finished"] += 1
+            state["failed"] += pixbuf is None
+            if state["finished"] == state["total"]:
+                done.set()
+
+    scheduler = wallpaper.DecodeScheduler(load, on_done, workers=backend.workers)
+    started = time.perf_counter()
+
+    count = 0
+    for dir_entry in wallpaper.scan_wallpapers([directory]):
+        entry = wallpaper.Wallpaper(dir_entry.path, dir_entry.name, dir_entry.stat())
+        entry.index = count
+        count += 1
+        scheduler.submit([entry])
+
+    with lock:
+        state["total"] = count
+        if state["finished"] == count:
+            done.set()
+    done.wait()
+    finished = time.perf_counter()
+
+    scheduler.shutdown()
+    # RUSAGE_CHILDREN only counts children that have been waited for
+    backend.shutdown(wait=True)
+    loader.library_index.save()
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_rss_children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    elapsed = finished - started
+    return {
+        "images": count,
+        "failed": state["failed"],
+        "time_to_first_s": None if state["first"] is None else state["first"] - started,
+        "time_to_all_s": elapsed,
+        "images_per_sec": count / elapsed if elapsed else None,
+        "peak_rss_kb": peak_rss,
+        "peak_rss_children_kb": peak_rss_children,
+    }
+
+
+def run_isolated(directory, backend_name, workers, cache_dir):
+    """Runs run_pipeline in a fresh interpreter so RSS figures are not shared"""
+    command = [sys.executable, os.path.abspath(__file__), "--run-one",
+               json.dumps([directory, backend_name, workers, cache_dir])]
+    result = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the wallpaper thumbnail pipeline")
+    parser.add_argument("--counts", default="100,1000",
+                        help="comma-separated image counts (default: 100,1000)")
+    parser.add_argument("--formats", default="png,jpeg,webp",
+                        help="comma-separated formats from png,jpeg,webp (default: all)")
+    parser.add_argument("--sizes", default="1920x1080,3840x2160",
+                        help="comma-separated WxH image sizes (default: 1920x1080,3840x2160)")
+    parser.add_argument("--backends", default=",".join(sorted(wallpaper.DECODE_BACKENDS)),
+                        help="comma-separated decode backends (default: all)")
+    parser.add_argument("--workers", default="",
+                        help="comma-separated worker counts; empty uses each backend's default")
+    # Not tempfile.gettempdir(): /tmp is often tmpfs, and the images would sit in RAM
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    parser.add_argument("--data-dir", default=os.path.join(cache_home, "wallpaper-bench"),
+                        help="where generated images are kept between runs (default: $XDG_CACHE_HOME/wallpaper-bench)")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_pipeline(*json.loads(args.run_one))))
+        return
+
+    counts = [int(c) for c in args.counts.split(",")]
+    sizes = [tuple(int(v) for v in size.split("x")) for size in args.sizes.split(",")]
+    workers_list = [int(w) for w in args.workers.split(",")] if args.workers else [None]
+
+    results = []
+    for fmt, (width, height), count in itertools.product(args.formats.split(","), sizes, counts):
+        try:
+            directory = generate_dataset(args.data_dir, fmt, width, height, count)
+        except RuntimeError as e:
+            print(f"Skipping {fmt}: {e}", file=sys.stderr)
+            continue
+
+        for backend_name, workers in itertools.product(args.backends.split(","), workers_list):
+            cache_dir = tempfile.mkdtemp(prefix="wallpaper-bench-cache-")
+            try:
+                for cache_state in ("cold", "warm"):
+                    print(f"{fmt} {width}x{height} x{count} {backend_name} workers={workers} {cache_state}",
+                          file=sys.stderr)
+                    run = run_isolated(directory, backend_name, workers, cache_dir)
+                    run.update(format=fmt, width=width, height=height, count=count,
+                               backend=backend_name, workers=workers, cache=cache_state)
+                    results.append(run)
+            finally:
+                shutil.rmtree(cache_dir, ignore_errors=True)
+
+    report = {
+        "schema": 1,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "host": {"python": platform.python_version(), "machine": platform.machine(),
+                 "cpus": os.cpu_count()},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
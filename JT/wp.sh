@@ -2,12 +2,5 @@
 
 SCRIPT="$HOME/wallpaper.py"
 
-# Check if the script is already running
-if pgrep -f "python.*$SCRIPT" > /dev/null; then
-    # Kill it if running
-    pkill -f "python.*$SCRIPT"
-else
-    # Start it if not running
-    python "$SCRIPT" &
-fi
-
+# Toggle the running daemon over its socket; start one (shown) if none answers
+python "$SCRIPT" --toggle > /dev/null 2>&1 || python "$SCRIPT" --daemon --show &